@@ -1,13 +1,44 @@
-from flask import Flask, request, jsonify
+import os
+from flask import Flask, request, jsonify, abort
 from flask_cors import CORS
 from config import Config
+from compression import init_compression
 from models import (
-    db, Client, Chambre, Reservation, ReservationStaging,
-    client_schema, clients_schema, chambre_schema, chambres_schema,
-    reservation_schema, reservations_schema
+    db, Client, Chambre, Reservation, ReservationArchive, ReservationStaging, Tarif,
+    RemiseSejour, client_schema, clients_schema, clients_simples_schema, client_simple_schema,
+    resume_client_schema, chambre_schema, chambres_schema, reservation_schema,
+    reservations_schema, reservations_simples_schema, reservations_client_schema, tarif_schema,
+    tarifs_schema, remise_schema, remises_schema, demandes_devis_schema,
+    reservations_archive_schema, statuts_chambres_schema
 )
+from pricing import moteur
+from profiles import page_historique, profils, resume_client
+from quotes import evaluer_demandes
+from indexes import init_indexes
+from maintenance import init_maintenance, metriques as metriques_maintenance
+from replicas import configurer_binds, init_replicas, lecture_seule, metriques as metriques_routage
+from lean import lister_chambres, paginer_clients, paginer_reservations
+from write_buffer import coalescer, ecrire_statuts, init_write_buffer, metriques as metriques_statuts
 from datetime import datetime
 from marshmallow import ValidationError
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def parse_ids(valeur, maximum):
+    """Analyse un paramètre 'ids=1,2,3' (ordre conservé, doublons ignorés)"""
+    try:
+        ids = [int(morceau) for morceau in valeur.split(',') if morceau.strip()]
+        # Au-delà d'un entier 64 bits, le pilote lèverait OverflowError (500)
+        if any(not -2 ** 63 <= i < 2 ** 63 for i in ids):
+            raise ValueError
+    except ValueError:
+        raise ValueError('Le paramètre ids doit être une liste d\'entiers séparés par des virgules')
+    if not ids:
+        raise ValueError('Le paramètre ids est vide')
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > maximum:
+        raise ValueError(f'Au plus {maximum} identifiants par requête')
+    return ids
 
 
 def create_app(config_name='default'):
@@ -16,22 +47,63 @@ def create_app(config_name='default'):
     app.config.from_object(Config)
 
     # Initialisation des extensions
+    replicas = configurer_binds(app)
     db.init_app(app)
+    init_replicas(app, db, replicas)
     CORS(app)
+    init_compression(app)
+    moteur.init_app(app)
+    profils.init_app(app)
 
     # Contexte de l'application
     with app.app_context():
-        db.create_all()
+        db.create_all(bind_key=None)  # les réplicas sont alimentés par réplication
+
+    init_maintenance(app)
+    init_indexes(app)
+    init_write_buffer(app)
+
+    def _multi_get(modele, schema, schema_simple, chargements):
+        """Récupère ?ids=1,2,3 en une requête IN, dans l'ordre demandé"""
+        try:
+            ids = parse_ids(request.args['ids'], app.config['MULTI_GET_MAX_IDS'])
+        except ValueError as err:
+            return jsonify({
+                'success': False,
+                'message': str(err)
+            }), 400
+
+        simple = request.args.get('shallow', 'false').lower() == 'true'
+        query = modele.query.filter(modele.id.in_(ids))
+        if not simple:
+            query = query.options(*chargements)
+        objets = {objet.id: objet for objet in query}
+
+        return jsonify({
+            'success': True,
+            'data': (schema_simple if simple else schema).dump(
+                [objets[i] for i in ids if i in objets]),
+            'introuvables': [i for i in ids if i not in objets]
+        }), 200
 
     # ==================== ROUTES CLIENTS ====================
 
     @app.route('/api/clients', methods=['GET'])
     def get_clients():
-        """Récupérer tous les clients avec pagination"""
+        """Récupérer tous les clients avec pagination (ou ?ids=1,2,3)"""
+        if 'ids' in request.args:
+            return _multi_get(Client, clients_schema, clients_simples_schema,
+                              [selectinload(Client.reservations).joinedload(Reservation.chambre)])
+
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
 
-        clients = Client.query.paginate(page=page, per_page=per_page, error_out=False)
+        if app.config['LEAN_READS']:
+            clients = paginer_clients(page, per_page)
+        else:
+            clients = Client.query.order_by(Client.id).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
 
         return jsonify({
             'success': True,
@@ -46,11 +118,42 @@ def create_app(config_name='default'):
 
     @app.route('/api/clients/<int:client_id>', methods=['GET'])
     def get_client(client_id):
-        """Récupérer un client spécifique"""
+        """Récupérer le profil d'un client et le résumé de ses séjours"""
         client = Client.query.get_or_404(client_id)
+        data = client_simple_schema.dump(client)
+        data['resume'] = resume_client_schema.dump(resume_client(client_id))
         return jsonify({
             'success': True,
-            'data': client_schema.dump(client)
+            'data': data
+        }), 200
+
+    @app.route('/api/clients/<int:client_id>/reservations', methods=['GET'])
+    def get_client_reservations(client_id):
+        """Historique des réservations d'un client, paginé par curseur (?cursor=...)"""
+        Client.query.get_or_404(client_id)
+
+        per_page = request.args.get('per_page', 10, type=int)
+        per_page = min(max(per_page, 1), app.config['HISTORY_MAX_PER_PAGE'])
+        archive = request.args.get('archive', 'false').lower() == 'true'
+        options = () if archive else (joinedload(Reservation.chambre),)
+
+        try:
+            reservations, suivant = page_historique(client_id, per_page, request.args.get('cursor'),
+                                                    archive, options)
+        except ValueError as err:
+            return jsonify({
+                'success': False,
+                'message': str(err)
+            }), 400
+
+        schema = reservations_archive_schema if archive else reservations_client_schema
+        return jsonify({
+            'success': True,
+            'data': schema.dump(reservations),
+            'pagination': {
+                'per_page': per_page,
+                'next_cursor': suivant
+            }
         }), 200
 
     @app.route('/api/clients', methods=['POST'])
@@ -113,11 +216,19 @@ def create_app(config_name='default'):
             'data': client_schema.dump(client)
         }), 200
 
+    def _supprimer_clients(ids):
+        """Supprime des clients et tout leur historique, en requêtes ensemblistes"""
+        Reservation.query.filter(Reservation.client_id.in_(ids)).delete(synchronize_session=False)
+        ReservationArchive.query.filter(ReservationArchive.client_id.in_(ids)).delete(
+            synchronize_session=False)
+        return Client.query.filter(Client.id.in_(ids)).delete(synchronize_session=False)
+
     @app.route('/api/clients/<int:client_id>', methods=['DELETE'])
     def delete_client(client_id):
         """Supprimer un client"""
-        client = Client.query.get_or_404(client_id)
-        db.session.delete(client)
+        if not _supprimer_clients([client_id]):
+            db.session.rollback()
+            abort(404)
         db.session.commit()
 
         return jsonify({
@@ -125,24 +236,56 @@ def create_app(config_name='default'):
             'message': 'Client supprimé'
         }), 200
 
+    @app.route('/api/clients', methods=['DELETE'])
+    def delete_clients():
+        """Supprimer un lot de clients (purge RGPD) : ?ids=1,2,3"""
+        try:
+            ids = parse_ids(request.args.get('ids', ''), app.config['BULK_MAX_IDS'])
+        except ValueError as err:
+            return jsonify({
+                'success': False,
+                'message': str(err)
+            }), 400
+
+        existants = set(db.session.scalars(db.select(Client.id).where(Client.id.in_(ids))))
+        if existants:
+            _supprimer_clients(list(existants))
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': f'{len(existants)} client(s) supprimé(s)',
+            'data': {
+                'supprimes': [i for i in ids if i in existants],
+                'introuvables': [i for i in ids if i not in existants]
+            }
+        }), 200
+
     # ==================== ROUTES CHAMBRES ====================
 
     @app.route('/api/chambres', methods=['GET'])
     def get_chambres():
-        """Récupérer toutes les chambres"""
+        """Récupérer toutes les chambres (ou ?ids=1,2,3)"""
+        if 'ids' in request.args:
+            return _multi_get(Chambre, chambres_schema, chambres_schema, [])
+
         type_chambre = request.args.get('type')
         disponible = request.args.get('disponible')
+        if disponible is not None:
+            disponible = disponible.lower() == 'true'
 
-        query = Chambre.query
+        if app.config['LEAN_READS']:
+            chambres = lister_chambres(type_chambre, disponible)
+        else:
+            query = Chambre.query
 
-        if type_chambre:
-            query = query.filter_by(type=type_chambre)
+            if type_chambre:
+                query = query.filter_by(type=type_chambre)
 
-        if disponible is not None:
-            disponible_bool = disponible.lower() == 'true'
-            query = query.filter_by(disponible=disponible_bool)
+            if disponible is not None:
+                query = query.filter_by(disponible=disponible)
 
-        chambres = query.all()
+            chambres = query.all()
 
         return jsonify({
             'success': True,
@@ -202,7 +345,15 @@ def create_app(config_name='default'):
         for key, value in data.items():
             setattr(chambre, key, value)
 
-        db.session.commit()
+        tampon = app.extensions.get('tampon_statuts')
+        if tampon is not None and 'disponible' in data:
+            # Comme ecrire_statuts : un statut encore en attente ne doit pas
+            # écraser cette valeur au prochain vidage
+            with tampon.verrou_ecriture:
+                tampon.retirer([chambre_id])
+                db.session.commit()
+        else:
+            db.session.commit()
 
         return jsonify({
             'success': True,
@@ -210,43 +361,263 @@ def create_app(config_name='default'):
             'data': chambre_schema.dump(chambre)
         }), 200
 
+    @app.route('/api/chambres/status', methods=['PATCH'])
+    def update_statuts_chambres():
+        """Changer la disponibilité de nombreuses chambres : [{"id": 1, "disponible": false}, ...]"""
+        payload = request.json
+        if isinstance(payload, dict):
+            payload = payload.get('statuts')
+        if not isinstance(payload, list) or not payload:
+            return jsonify({
+                'success': False,
+                'message': 'Une liste de statuts est attendue'
+            }), 400
+
+        if len(payload) > app.config['BULK_MAX_IDS']:
+            return jsonify({
+                'success': False,
+                'message': f"Au plus {app.config['BULK_MAX_IDS']} statuts par appel"
+            }), 400
+
+        try:
+            statuts = coalescer(statuts_chambres_schema.load(payload))
+        except ValidationError as err:
+            return jsonify({
+                'success': False,
+                'errors': err.messages
+            }), 400
+
+        tampon = app.extensions.get('tampon_statuts')
+        if tampon is not None and request.args.get('durabilite') != 'sync':
+            return jsonify({
+                'success': True,
+                'message': f'{len(statuts)} statut(s) en attente d\'écriture',
+                'data': {'en_attente': tampon.ajouter(statuts)}
+            }), 202
+
+        modifies = ecrire_statuts(statuts, tampon)
+
+        return jsonify({
+            'success': True,
+            'message': f'{len(modifies)} chambre(s) mise(s) à jour',
+            'data': {
+                'mises_a_jour': [i for i in statuts if i in modifies],
+                'introuvables': [i for i in statuts if i not in modifies]
+            }
+        }), 200
+
     @app.route('/api/chambres/<int:chambre_id>', methods=['DELETE'])
     def delete_chambre(chambre_id):
         """Supprimer une chambre"""
-        chambre = Chambre.query.get_or_404(chambre_id)
-        db.session.delete(chambre)
+        Reservation.query.filter_by(chambre_id=chambre_id).delete(synchronize_session=False)
+        if not Chambre.query.filter_by(id=chambre_id).delete(synchronize_session=False):
+            db.session.rollback()
+            abort(404)
         db.session.commit()
+        moteur.invalider()
+        profils.invalider()
 
         return jsonify({
             'success': True,
             'message': 'Chambre supprimée'
         }), 200
 
+    @app.route('/api/chambres/<int:chambre_id>/devis', methods=['GET'])
+    def get_devis_chambre(chambre_id):
+        """Calculer le prix d'un séjour dans une chambre"""
+        Chambre.query.get_or_404(chambre_id)
+        try:
+            date_arrivee = datetime.strptime(request.args['date_arrivee'], '%Y-%m-%d').date()
+            date_depart = datetime.strptime(request.args['date_depart'], '%Y-%m-%d').date()
+        except (KeyError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'Paramètres date_arrivee et date_depart requis (AAAA-MM-JJ)'
+            }), 400
+
+        try:
+            devis = moteur.devis(chambre_id, date_arrivee, date_depart)
+        except ValueError as err:
+            return jsonify({
+                'success': False,
+                'message': str(err)
+            }), 400
+        except LookupError:
+            # Chambre supprimée depuis get_or_404 (ou absente du réplica lu)
+            return jsonify({
+                'success': False,
+                'message': 'Chambre introuvable'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'chambre_id': chambre_id,
+                'date_arrivee': date_arrivee.isoformat(),
+                'date_depart': date_depart.isoformat(),
+                'nb_nuits': devis.nb_nuits,
+                'sous_total': str(devis.sous_total),
+                'remise_pourcentage': str(devis.remise_pourcentage),
+                'prix_total': str(devis.prix_total)
+            }
+        }), 200
+
+    # ==================== ROUTES TARIFS ====================
+
+    @app.route('/api/tarifs', methods=['GET'])
+    def get_tarifs():
+        """Récupérer les tarifs et remises séjour"""
+        type_chambre = request.args.get('type')
+
+        tarifs = Tarif.query
+        remises = RemiseSejour.query
+        if type_chambre:
+            tarifs = tarifs.filter_by(type_chambre=type_chambre)
+            remises = remises.filter(db.or_(RemiseSejour.type_chambre == type_chambre,
+                                            RemiseSejour.type_chambre.is_(None)))
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'tarifs': tarifs_schema.dump(tarifs.order_by(Tarif.date_debut).all()),
+                'remises': remises_schema.dump(remises.order_by(RemiseSejour.nuits_min).all())
+            }
+        }), 200
+
+    @app.route('/api/tarifs', methods=['POST'])
+    def create_tarif():
+        """Créer un tarif saisonnier"""
+        try:
+            data = tarif_schema.load(request.json)
+        except ValidationError as err:
+            return jsonify({
+                'success': False,
+                'errors': err.messages
+            }), 400
+
+        tarif = Tarif(**data)
+        db.session.add(tarif)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': 'Tarif créé avec succès',
+            'data': tarif_schema.dump(tarif)
+        }), 201
+
+    @app.route('/api/tarifs/<int:tarif_id>', methods=['DELETE'])
+    def delete_tarif(tarif_id):
+        """Supprimer un tarif"""
+        tarif = Tarif.query.get_or_404(tarif_id)
+        db.session.delete(tarif)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': 'Tarif supprimé'
+        }), 200
+
+    @app.route('/api/remises', methods=['POST'])
+    def create_remise():
+        """Créer une remise selon la durée du séjour"""
+        try:
+            data = remise_schema.load(request.json)
+        except ValidationError as err:
+            return jsonify({
+                'success': False,
+                'errors': err.messages
+            }), 400
+
+        remise = RemiseSejour(**data)
+        db.session.add(remise)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': 'Remise créée avec succès',
+            'data': remise_schema.dump(remise)
+        }), 201
+
+    @app.route('/api/remises/<int:remise_id>', methods=['DELETE'])
+    def delete_remise(remise_id):
+        """Supprimer une remise"""
+        remise = RemiseSejour.query.get_or_404(remise_id)
+        db.session.delete(remise)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': 'Remise supprimée'
+        }), 200
+
+    @app.route('/api/quotes', methods=['POST'])
+    @lecture_seule
+    def create_quotes():
+        """Calculer prix et disponibilité de nombreuses demandes en un appel"""
+        payload = request.json
+        if isinstance(payload, dict):
+            payload = payload.get('demandes')
+        if not isinstance(payload, list):
+            return jsonify({
+                'success': False,
+                'message': 'Une liste de demandes est attendue'
+            }), 400
+
+        if len(payload) > app.config['QUOTES_MAX_ITEMS']:
+            return jsonify({
+                'success': False,
+                'message': f"Au plus {app.config['QUOTES_MAX_ITEMS']} demandes par appel"
+            }), 400
+
+        try:
+            demandes = demandes_devis_schema.load(payload)
+        except ValidationError as err:
+            return jsonify({
+                'success': False,
+                'errors': err.messages
+            }), 400
+
+        return jsonify({
+            'success': True,
+            'data': evaluer_demandes(demandes)
+        }), 200
+
     # ==================== ROUTES RÉSERVATIONS ====================
 
     @app.route('/api/reservations', methods=['GET'])
     def get_reservations():
-        """Récupérer toutes les réservations"""
+        """Récupérer toutes les réservations (archivées avec ?archive=true, ou ?ids=1,2,3)"""
+        if 'ids' in request.args:
+            return _multi_get(Reservation, reservations_schema, reservations_simples_schema,
+                              [joinedload(Reservation.client), joinedload(Reservation.chambre)])
+
         statut = request.args.get('statut')
         client_id = request.args.get('client_id', type=int)
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        archive = request.args.get('archive', 'false').lower() == 'true'
 
-        query = Reservation.query
+        modele = ReservationArchive if archive else Reservation
+        schema = reservations_archive_schema if archive else reservations_schema
 
-        if statut:
-            query = query.filter_by(statut=statut)
+        if app.config['LEAN_READS']:
+            reservations = paginer_reservations(page, per_page, statut, client_id, archive)
+        else:
+            query = modele.query
 
-        if client_id:
-            query = query.filter_by(client_id=client_id)
+            if statut:
+                query = query.filter_by(statut=statut)
 
-        reservations = query.order_by(Reservation.date_reservation.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+            if client_id:
+                query = query.filter_by(client_id=client_id)
+
+            reservations = query.order_by(modele.date_reservation.desc(), modele.id.desc()).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
 
         return jsonify({
             'success': True,
-            'data': reservations_schema.dump(reservations.items),
+            'data': schema.dump(reservations.items),
             'pagination': {
                 'page': reservations.page,
                 'per_page': reservations.per_page,
@@ -299,8 +670,14 @@ def create_app(config_name='default'):
 
         # Calculer le prix total
         if 'prix_total' not in data or data['prix_total'] is None:
-            nb_nuits = (data['date_depart'] - data['date_arrivee']).days
-            data['prix_total'] = float(chambre.prix_par_nuit) * nb_nuits
+            try:
+                devis = moteur.devis_exact(chambre, data['date_arrivee'], data['date_depart'])
+            except ValueError as err:
+                return jsonify({
+                    'success': False,
+                    'message': str(err)
+                }), 400
+            data['prix_total'] = devis.prix_total
 
         reservation = Reservation(**data)
         db.session.add(reservation)
@@ -328,6 +705,27 @@ def create_app(config_name='default'):
         for key, value in data.items():
             setattr(reservation, key, value)
 
+        # Recalculer le prix si le séjour a changé
+        sejour_modifie = {'chambre_id', 'date_arrivee', 'date_depart'} & data.keys()
+        if sejour_modifie and data.get('prix_total') is None:
+            chambre = Chambre.query.get(reservation.chambre_id)
+            if not chambre:
+                db.session.rollback()
+                return jsonify({
+                    'success': False,
+                    'message': 'Chambre introuvable'
+                }), 404
+            try:
+                devis = moteur.devis_exact(chambre, reservation.date_arrivee,
+                                           reservation.date_depart)
+            except ValueError as err:
+                db.session.rollback()
+                return jsonify({
+                    'success': False,
+                    'message': str(err)
+                }), 400
+            reservation.prix_total = devis.prix_total
+
         db.session.commit()
 
         return jsonify({
@@ -372,6 +770,7 @@ def create_app(config_name='default'):
         total_reservations = Reservation.query.count()
         reservations_confirmees = Reservation.query.filter_by(statut='confirmee').count()
         reservations_annulees = Reservation.query.filter_by(statut='annulee').count()
+        reservations_terminees = Reservation.query.filter_by(statut='terminee').count()
 
         return jsonify({
             'success': True,
@@ -385,11 +784,35 @@ def create_app(config_name='default'):
                 'reservations': {
                     'total': total_reservations,
                     'confirmees': reservations_confirmees,
-                    'annulees': reservations_annulees
+                    'annulees': reservations_annulees,
+                    'terminees': reservations_terminees
                 }
             }
         }), 200
 
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics():
+        """Métriques internes (maintenance, routage lecture/écriture, statuts des chambres)"""
+        routage = dict(metriques_routage)
+        if 'replicas' in app.extensions:
+            routage['replicas'] = app.extensions['replicas'].etat()
+
+        statuts = dict(metriques_statuts)
+        tampon = app.extensions.get('tampon_statuts')
+        statuts['durabilite'] = app.config['ROOM_STATUS_DURABILITY']
+        statuts['en_attente'] = tampon.en_attente() if tampon is not None else 0
+        statuts['commits_evites'] = statuts['statuts_recus'] - statuts['commits']
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'pid': os.getpid(),
+                'maintenance': dict(metriques_maintenance),
+                'routage': routage,
+                'statuts_chambres': statuts
+            }
+        }), 200
+
     # ==================== ROUTE RACINE ====================
 
     @app.route('/')
@@ -402,6 +825,7 @@ def create_app(config_name='default'):
                 'clients': '/api/clients',
                 'chambres': '/api/chambres',
                 'reservations': '/api/reservations',
+                'tarifs': '/api/tarifs',
                 'stats': '/api/stats'
             }
         }), 200
@@ -0,0 +1,108 @@
+"""
+Benchmark de la compression des réponses JSON
+
+Mesure, pour chaque encodage et niveau, la taille obtenue et le temps CPU de
+compression/décompression sur une liste de réservations imbriquées typique
+de GET /api/reservations ou GET /api/clients.
+
+    python benchmarks/bench_compression.py [nombre_reservations]
+"""
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compression import algorithmes_disponibles, brotli, compresser, zstandard  # noqa: E402
+
+NIVEAUX = {
+    'gzip': [1, 6, 9],
+    'br': [1, 4, 6, 11],
+    'zstd': [1, 3, 9, 19],
+}
+
+DECOMPRESSEURS = {
+    'gzip': gzip.decompress,
+    'br': lambda d: brotli.decompress(d),
+    'zstd': lambda d: zstandard.ZstdDecompressor().decompress(d),
+}
+
+
+def generer_payload(nombre):
+    """Construit un corps JSON proche de celui de l'API"""
+    types = [('Simple', '75.00', 1), ('Double', '120.00', 2), ('Suite', '250.00', 4)]
+    reservations = []
+    for i in range(nombre):
+        type_chambre, prix, capacite = types[i % 3]
+        arrivee = date(2025, 1, 1) + timedelta(days=i % 365)
+        reservations.append({
+            'id': i + 1,
+            'client_id': i % 500 + 1,
+            'chambre_id': i % 60 + 1,
+            'date_arrivee': arrivee.isoformat(),
+            'date_depart': (arrivee + timedelta(days=3)).isoformat(),
+            'nombre_personnes': capacite,
+            'prix_total': f'{float(prix) * 3:.2f}',
+            'statut': 'confirmee',
+            'date_reservation': '2024-11-02T10:15:00',
+            'client': {
+                'id': i % 500 + 1,
+                'nom': f'Nom{i % 500}',
+                'prenom': f'Prenom{i % 500}',
+                'email': f'client{i % 500}@email.com',
+                'telephone': '+33612345678',
+                'date_creation': '2024-10-01T08:00:00',
+            },
+            'chambre': {
+                'id': i % 60 + 1,
+                'numero': str(100 + i % 60),
+                'type': type_chambre,
+                'prix_par_nuit': prix,
+                'capacite': capacite,
+                'disponible': True,
+            },
+        })
+    return json.dumps({'success': True, 'data': reservations}).encode('utf-8')
+
+
+def mesurer(fonction, repetitions):
+    """Temps médian d'un appel, en millisecondes"""
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    durees.sort()
+    return durees[len(durees) // 2]
+
+
+def main():
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    data = generer_payload(nombre)
+    print(f'Payload : {nombre} réservations, {len(data) / 1024:.1f} Kio non compressés\n')
+    print(f"{'encodage':<8} {'niveau':>6} {'taille (Kio)':>13} {'ratio':>7} "
+          f"{'compr. (ms)':>12} {'décompr. (ms)':>14} {'Mo/s':>8}")
+
+    for encodage in algorithmes_disponibles():
+        for niveau in NIVEAUX[encodage]:
+            compresse = compresser(data, encodage, niveau)
+            repetitions = 3 if niveau >= 11 else 15
+            t_compression = mesurer(lambda: compresser(data, encodage, niveau), repetitions)
+            t_decompression = mesurer(lambda: DECOMPRESSEURS[encodage](compresse), 15)
+            debit = len(data) / 1024 / 1024 / (t_compression / 1000)
+            print(f'{encodage:<8} {niveau:>6} {len(compresse) / 1024:>13.1f} '
+                  f'{len(data) / len(compresse):>7.1f} {t_compression:>12.2f} '
+                  f'{t_decompression:>14.2f} {debit:>8.1f}')
+
+    print()
+    manquants = {'br': 'brotli', 'zstd': 'zstandard'}
+    for encodage, paquet in manquants.items():
+        if encodage not in algorithmes_disponibles():
+            print(f'({encodage} ignoré : installez le paquet « {paquet} »)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark mémoire des routes de liste : instances ORM contre lignes légères
+
+Pour chaque route, la même requête est servie avec LEAN_READS désactivé puis
+activé ; tracemalloc mesure le pic de mémoire alloué pendant la requête, et le
+nombre de collectes de génération 0 déclenchées (une tous les 700 objets
+conteneurs alloués nets) rend compte du volume d'allocations.
+
+    python benchmarks/bench_lean_reads.py [clients] [reservations] [repetitions]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from temporaire import application_temporaire  # noqa: E402
+
+URLS = [
+    '/api/clients?per_page=100',
+    '/api/chambres',
+    '/api/reservations?per_page=500',
+    '/api/reservations?statut=confirmee&per_page=500',
+    '/api/reservations?archive=true&per_page=500',
+]
+
+
+def peupler(db, nombre_clients, nombre_reservations):
+    from models import Chambre, Client, Reservation, ReservationArchive
+
+    types = ['Simple', 'Double', 'Suite']
+    db.session.execute(insert(Chambre), [
+        {'numero': str(i), 'type': types[i % 3], 'prix_par_nuit': 80 + i % 50,
+         'capacite': 1 + i % 4}
+        for i in range(200)
+    ])
+    db.session.execute(insert(Client), [
+        {'nom': f'Nom{i}', 'prenom': 'Prenom', 'email': f'client{i}@email.com',
+         'telephone': '+33612345678', 'date_creation': datetime(2024, 1, 1)}
+        for i in range(nombre_clients)
+    ])
+    sejours = [
+        {'client_id': 1 + i % nombre_clients, 'chambre_id': 1 + i % 200,
+         'date_arrivee': date(2025, 1, 1) + timedelta(days=i % 365),
+         'date_depart': date(2025, 1, 4) + timedelta(days=i % 365),
+         'nombre_personnes': 2, 'prix_total': 360, 'statut': 'confirmee',
+         'date_reservation': datetime(2024, 6, 1) + timedelta(minutes=i)}
+        for i in range(nombre_reservations)
+    ]
+    db.session.execute(insert(Reservation), sejours)
+    db.session.execute(insert(ReservationArchive), [
+        dict(sejour, id=1000000 + i) for i, sejour in enumerate(sejours[:2000])
+    ])
+    db.session.commit()
+
+
+def mesurer(client, url, repetitions):
+    """Médianes (pic Kio, collectes gen0, ms) et corps de la réponse"""
+    client.get(url)  # préchauffage (compilation des requêtes, caches)
+    mesures = []
+    for _ in range(repetitions):
+        gc.collect()
+        collectes = gc.get_stats()[0]['collections']
+        tracemalloc.start()
+        debut = time.perf_counter()
+        reponse = client.get(url)
+        duree = (time.perf_counter() - debut) * 1000
+        _, pic = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        mesures.append((pic / 1024, gc.get_stats()[0]['collections'] - collectes, duree))
+
+    medianes = [sorted(colonne)[len(colonne) // 2] for colonne in zip(*mesures)]
+    return medianes, reponse.get_data()
+
+
+def comparer(app, repetitions):
+    """Affiche, route par route, les mesures des deux modes"""
+    client = app.test_client()
+    print(f"{'route':<48} {'mode':<5} {'pic (Kio)':>10} {'gen0':>5} {'ms':>8}")
+    for url in URLS:
+        resultats = {}
+        for mode, lean in (('orm', False), ('lean', True)):
+            app.config['LEAN_READS'] = lean
+            resultats[mode] = mesurer(client, url, repetitions)
+        for mode, ((pic, collectes, duree), _) in resultats.items():
+            print(f'{url:<48} {mode:<5} {pic:>10.0f} {collectes:>5.0f} {duree:>8.1f}')
+        gain = 1 - resultats['lean'][0][0] / resultats['orm'][0][0]
+        identique = resultats['lean'][1] == resultats['orm'][1]
+        print(f"{'':<48} {'':<5} {f'-{gain:.0%}':>10}"
+              + ('' if identique else '  RÉPONSES DIFFÉRENTES'))
+
+
+def main():
+    nombre_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    nombre_reservations = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    repetitions = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    with application_temporaire(COMPRESS_ENABLED=False) as app:
+        from models import db
+
+        with app.app_context():
+            peupler(db, nombre_clients, nombre_reservations)
+        print(f'{nombre_clients} clients, {nombre_reservations} réservations, '
+              f'médiane de {repetitions} requêtes\n')
+        comparer(app, repetitions)
+
+
+if __name__ == '__main__':
+    main()
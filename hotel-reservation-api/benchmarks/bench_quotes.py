@@ -0,0 +1,134 @@
+"""
+Benchmark des devis groupés (POST /api/quotes)
+
+Une grille de demandes (chambres x dates d'arrivée) est évaluée en un appel
+POST /api/quotes, puis demande par demande (deux requêtes SQL par cellule),
+ce qu'un client ferait sans l'endpoint groupé. Les résultats des deux passes
+sont vérifiés identiques.
+
+    python benchmarks/bench_quotes.py [chambres] [reservations] [cellules] [repetitions]
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert  # noqa: E402
+
+from temporaire import application_temporaire  # noqa: E402
+
+
+def peupler(db, nombre_chambres, nombre_reservations):
+    from models import Chambre, Client, Reservation, Tarif, RemiseSejour
+
+    aleatoire = random.Random(42)
+    debut = date.today() + timedelta(days=7)
+    types = ['Simple', 'Double', 'Suite']
+    db.session.execute(insert(Chambre), [
+        {'numero': str(i), 'type': types[i % 3], 'prix_par_nuit': 80 + i % 7 * 10,
+         'capacite': 1 + i % 4, 'disponible': i % 10 != 0}
+        for i in range(nombre_chambres)
+    ])
+    db.session.execute(insert(Client), [
+        {'nom': f'Nom{i}', 'prenom': 'Prenom', 'email': f'client{i}@email.com'}
+        for i in range(100)
+    ])
+    sejours = []
+    for i in range(nombre_reservations):
+        arrivee = debut + timedelta(days=aleatoire.randrange(180))
+        sejours.append({
+            'client_id': 1 + i % 100, 'chambre_id': 1 + aleatoire.randrange(nombre_chambres),
+            'date_arrivee': arrivee, 'date_depart': arrivee + timedelta(days=1 + i % 5),
+            'nombre_personnes': 1, 'prix_total': 100,
+            'statut': 'annulee' if i % 9 == 0 else 'confirmee'
+        })
+    db.session.execute(insert(Reservation), sejours)
+    db.session.execute(insert(Tarif), [
+        {'type_chambre': 'Double', 'date_debut': debut, 'date_fin': debut + timedelta(days=90),
+         'prix_par_nuit': 120, 'jours_semaine': '45', 'priorite': 1},
+        {'type_chambre': 'Suite', 'date_debut': debut + timedelta(days=30),
+         'date_fin': debut + timedelta(days=60), 'prix_par_nuit': 250, 'priorite': 0},
+    ])
+    db.session.execute(insert(RemiseSejour), [
+        {'type_chambre': None, 'nuits_min': 4, 'pourcentage': 5},
+    ])
+    db.session.commit()
+    return debut
+
+
+def grille(debut, nombre_chambres, cellules):
+    """cellules demandes : chambres x dates d'arrivée, séjours de 3 nuits"""
+    chambres = min(nombre_chambres, 50)
+    demandes = []
+    for n in range(cellules):
+        arrivee = debut + timedelta(days=n // chambres * 3)
+        demandes.append({
+            'chambre_id': 1 + n % chambres, 'nombre_personnes': 1,
+            'date_arrivee': arrivee.isoformat(),
+            'date_depart': (arrivee + timedelta(days=3)).isoformat()
+        })
+    return demandes
+
+
+def mesurer(app, demandes, repetitions):
+    """Médianes (ms, requêtes SQL) des deux passes et leurs résultats"""
+    from models import db, demandes_devis_schema
+    from quotes import evaluer_demandes
+
+    client = app.test_client()
+    requetes = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: requetes.append(1))
+
+    def groupe():
+        return client.post('/api/quotes', json={'demandes': demandes}).get_json()['data']
+
+    def une_a_une():
+        with app.test_request_context():
+            return [resultat
+                    for demande in demandes_devis_schema.load(demandes)
+                    for resultat in evaluer_demandes([demande])]
+
+    mesures = {}
+    for nom, passe in (('POST /api/quotes', groupe), ('demande par demande', une_a_une)):
+        resultats = passe()  # préchauffage (tables de prix, compilation des requêtes)
+        durees, nombres = [], []
+        for _ in range(repetitions):
+            del requetes[:]
+            debut = time.perf_counter()
+            resultats = passe()
+            durees.append((time.perf_counter() - debut) * 1000)
+            nombres.append(len(requetes))
+        mesures[nom] = (sorted(durees)[len(durees) // 2], sorted(nombres)[len(nombres) // 2],
+                        [{cle: valeur for cle, valeur in r.items() if cle != 'index'}
+                         for r in resultats])
+    return mesures
+
+
+def main():
+    nombre_chambres = int(sys.argv[1]) if len(sys.argv) > 1 else 70
+    nombre_reservations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    cellules = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    repetitions = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+
+    with application_temporaire(COMPRESS_ENABLED=False) as app:
+        from models import db
+
+        with app.app_context():
+            debut = peupler(db, nombre_chambres, nombre_reservations)
+        mesures = mesurer(app, grille(debut, nombre_chambres, cellules), repetitions)
+
+    print(f'{cellules} demandes, {nombre_chambres} chambres, {nombre_reservations} réservations, '
+          f'médiane de {repetitions} passes\n')
+    print(f"{'scénario':<22} {'ms':>8} {'requêtes':>9} {'ms/demande':>11}")
+    reference = mesures['POST /api/quotes'][2]
+    for nom, (duree, requetes, resultats) in mesures.items():
+        print(f'{nom:<22} {duree:>8.1f} {requetes:>9} {duree / cellules:>11.3f}'
+              + ('' if resultats == reference else '  RÉSULTATS DIFFÉRENTS'))
+
+
+if __name__ == '__main__':
+    main()
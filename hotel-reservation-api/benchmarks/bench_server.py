@@ -0,0 +1,80 @@
+"""
+Benchmark de débit HTTP d'une instance de l'API déjà démarrée
+
+Envoie des requêtes GET en boucle depuis N threads (connexions keep-alive)
+pendant une durée fixe et affiche le débit et les latences, par exemple pour
+comparer le serveur de développement (python app.py) et server.py.
+
+    python benchmarks/bench_server.py [url_de_base] [concurrence] [duree_s]
+"""
+import http.client
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+CHEMINS = (
+    '/api/chambres',
+    '/api/clients?per_page=10',
+    '/api/reservations?per_page=10',
+    '/api/stats',
+)
+
+
+def charger(base, fin, latences, erreurs):
+    """Boucle d'un thread client jusqu'à l'instant fin"""
+    url = urlsplit(base)
+    connexion = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=10)
+    i = 0
+    while time.perf_counter() < fin:
+        chemin = CHEMINS[i % len(CHEMINS)]
+        i += 1
+        debut = time.perf_counter()
+        try:
+            connexion.request('GET', chemin, headers={'Accept-Encoding': 'gzip'})
+            reponse = connexion.getresponse()
+            reponse.read()
+            if reponse.status != 200:
+                erreurs.append(reponse.status)
+            if reponse.getheader('Connection', '').lower() == 'close':
+                connexion.close()
+        except (OSError, http.client.HTTPException) as err:
+            erreurs.append(str(err))
+            connexion.close()
+            connexion = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=10)
+            continue
+        latences.append((time.perf_counter() - debut) * 1000)
+    connexion.close()
+
+
+def main():
+    base = sys.argv[1] if len(sys.argv) > 1 else 'http://127.0.0.1:5000'
+    concurrence = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    duree = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    latences, erreurs = [], []
+    fin = time.perf_counter() + duree
+    threads = [threading.Thread(target=charger, args=(base, fin, latences, erreurs))
+               for _ in range(concurrence)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latences.sort()
+    if not latences:
+        print(f'Aucune réponse de {base} ({len(erreurs)} erreurs)')
+        return
+
+    def centile(p):
+        return latences[min(len(latences) - 1, int(len(latences) * p))]
+
+    print(f'{base} - {concurrence} clients pendant {duree:.0f} s')
+    print(f'  requêtes : {len(latences)} ({len(erreurs)} erreurs)')
+    print(f'  débit    : {len(latences) / duree:.1f} req/s')
+    print(f'  latence  : p50 {centile(0.50):.1f} ms, p95 {centile(0.95):.1f} ms, '
+          f'p99 {centile(0.99):.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
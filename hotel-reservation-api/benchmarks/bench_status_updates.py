@@ -0,0 +1,95 @@
+"""
+Benchmark des mises à jour de disponibilité des chambres
+
+Rejoue le même flux de changements de statut (quelques chambres très
+sollicitées, comme en ménage) de trois façons et compte les commits :
+
+- un PUT /api/chambres/<id> par changement (un commit chacun) ;
+- PATCH /api/chambres/status par lots, mode 'sync' ;
+- un PATCH d'un seul statut par appel, mode 'buffered' (tampon en mémoire).
+
+L'état final de la base est vérifié identique dans les trois cas.
+
+    python benchmarks/bench_status_updates.py [changements] [chambres] [taille_lot]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+
+from config import Config  # noqa: E402
+from temporaire import application_temporaire  # noqa: E402
+
+
+def executer(nom, durabilite, nombre_chambres, envoyer):
+    """Rejoue le flux sur une base neuve de nombre_chambres chambres"""
+    from models import db, Chambre
+
+    with application_temporaire(ROOM_STATUS_DURABILITY=durabilite) as app:
+        client = app.test_client()
+        commits = []
+
+        with app.app_context():
+            db.session.add_all([Chambre(numero=str(i), type='Simple', prix_par_nuit=80, capacite=2)
+                                for i in range(nombre_chambres)])
+            db.session.commit()
+
+            event.listen(db.engine, 'commit', lambda conn: commits.append(1))
+            debut = time.perf_counter()
+            envoyer(client)
+            tampon = app.extensions.get('tampon_statuts')
+            if tampon is not None:
+                tampon.arreter()
+            duree = time.perf_counter() - debut
+            etat = dict(db.session.execute(db.select(Chambre.id, Chambre.disponible)).all())
+
+    return nom, duree, len(commits), etat
+
+
+def main():
+    changements = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    nombre_chambres = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    taille_lot = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    aleatoire = random.Random(42)
+    # Un tiers des chambres reçoit l'essentiel des changements
+    chaudes = max(1, nombre_chambres // 3)
+    flux = [{'id': aleatoire.randint(1, chaudes if aleatoire.random() < 0.8 else nombre_chambres),
+             'disponible': aleatoire.random() < 0.5}
+            for _ in range(changements)]
+
+    def unitaire(client):
+        for statut in flux:
+            client.put(f"/api/chambres/{statut['id']}", json={'disponible': statut['disponible']})
+
+    def par_lots(client):
+        for debut in range(0, len(flux), taille_lot):
+            client.patch('/api/chambres/status', json=flux[debut:debut + taille_lot])
+
+    def tampon(client):
+        for statut in flux:
+            client.patch('/api/chambres/status', json=[statut])
+
+    resultats = [
+        executer('PUT unitaire', 'sync', nombre_chambres, unitaire),
+        executer(f'PATCH lots de {taille_lot}', 'sync', nombre_chambres, par_lots),
+        executer('PATCH + tampon', 'buffered', nombre_chambres, tampon),
+    ]
+
+    print(f'{changements} changements sur {nombre_chambres} chambres '
+          f'(tampon : {Config.ROOM_STATUS_FLUSH_MS} ms / {Config.ROOM_STATUS_FLUSH_ITEMS} chambres)\n')
+    print(f"{'scénario':<20} {'durée (s)':>10} {'chgts/s':>9} {'commits':>8} {'commits/s':>10} "
+          f"{'évités':>8}")
+    reference = resultats[0][3]
+    for nom, duree, commits, etat in resultats:
+        print(f'{nom:<20} {duree:>10.2f} {changements / duree:>9.0f} {commits:>8} '
+              f'{commits / duree:>10.1f} {changements - commits:>8}'
+              + ('' if etat == reference else '  ÉTAT FINAL DIFFÉRENT'))
+
+
+if __name__ == '__main__':
+    main()
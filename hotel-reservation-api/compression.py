@@ -0,0 +1,199 @@
+"""
+Compression des réponses HTTP négociée via l'en-tête Accept-Encoding.
+
+gzip est toujours disponible ; brotli (``br``) et zstd ne sont proposés que si
+les paquets ``brotli`` et ``zstandard`` sont installés.
+"""
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    zstandard = None
+
+
+def algorithmes_disponibles():
+    """Encodages utilisables dans ce processus"""
+    algos = ['gzip']
+    if brotli is not None:
+        algos.append('br')
+    if zstandard is not None:
+        algos.append('zstd')
+    return algos
+
+
+def negocier(accept_encoding, preferences):
+    """
+    Choisit l'encodage à utiliser d'après l'en-tête Accept-Encoding.
+
+    Le poids ``q`` du client prime ; à poids égal, l'ordre de ``preferences``
+    (préférence serveur) départage. Retourne None si aucun encodage ne convient.
+    """
+    poids = {}
+    for element in accept_encoding.split(','):
+        morceaux = element.strip().split(';')
+        nom = morceaux[0].strip().lower()
+        if not nom:
+            continue
+        q = 1.0
+        for param in morceaux[1:]:
+            cle, _, valeur = param.strip().partition('=')
+            if cle.strip() == 'q':
+                try:
+                    q = float(valeur)
+                except ValueError:
+                    q = 0.0
+        poids[nom] = q
+
+    meilleur, meilleur_q = None, 0.0
+    for algo in preferences:
+        q = poids.get(algo, poids.get('*', 0.0))
+        if q > meilleur_q:
+            meilleur, meilleur_q = algo, q
+    return meilleur
+
+
+def compresser(data, encodage, niveau):
+    """Compresse un bloc d'octets complet"""
+    if encodage == 'gzip':
+        return gzip.compress(data, compresslevel=niveau, mtime=0)
+    if encodage == 'br':
+        return brotli.compress(data, quality=niveau)
+    if encodage == 'zstd':
+        return zstandard.ZstdCompressor(level=niveau).compress(data)
+    raise ValueError(f'Encodage non supporté : {encodage}')
+
+
+def compresser_flux(morceaux, encodage, niveau):
+    """Compresse progressivement une réponse produite par un générateur"""
+    if encodage == 'gzip':
+        compresseur = zlib.compressobj(niveau, zlib.DEFLATED, 31)
+        ajouter, terminer = compresseur.compress, compresseur.flush
+    elif encodage == 'br':
+        compresseur = brotli.Compressor(quality=niveau)
+        ajouter, terminer = compresseur.process, compresseur.finish
+    elif encodage == 'zstd':
+        compresseur = zstandard.ZstdCompressor(level=niveau).compressobj()
+        ajouter, terminer = compresseur.compress, compresseur.flush
+    else:
+        raise ValueError(f'Encodage non supporté : {encodage}')
+
+    try:
+        for morceau in morceaux:
+            if isinstance(morceau, str):
+                morceau = morceau.encode('utf-8')
+            sortie = ajouter(morceau)
+            if sortie:
+                yield sortie
+        yield terminer()
+    finally:
+        if hasattr(morceaux, 'close'):
+            morceaux.close()
+
+
+class CacheCompression:
+    """Cache LRU des corps compressés, borné en octets"""
+
+    def __init__(self, taille_max):
+        self.taille_max = taille_max
+        self.taille = 0
+        self.hits = 0
+        self.misses = 0
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def get(self, cle):
+        with self._verrou:
+            valeur = self._entrees.get(cle)
+            if valeur is None:
+                self.misses += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return valeur
+
+    def set(self, cle, valeur):
+        if len(valeur) > self.taille_max:
+            return
+        with self._verrou:
+            ancienne = self._entrees.pop(cle, None)
+            if ancienne is not None:
+                self.taille -= len(ancienne)
+            self._entrees[cle] = valeur
+            self.taille += len(valeur)
+            while self.taille > self.taille_max:
+                _, supprimee = self._entrees.popitem(last=False)
+                self.taille -= len(supprimee)
+
+
+def _est_cacheable(response):
+    return (request.method == 'GET'
+            and response.status_code == 200
+            and 'no-store' not in response.headers.get('Cache-Control', ''))
+
+
+def _compresser_reponse(response):
+    """Hook after_request : compresse la réponse si le client l'accepte"""
+    config = current_app.config
+    if not config['COMPRESS_ENABLED']:
+        return response
+
+    if (response.mimetype not in config['COMPRESS_MIMETYPES']
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    preferences = [a for a in config['COMPRESS_ALGORITHMS'] if a in algorithmes_disponibles()]
+    encodage = negocier(request.headers.get('Accept-Encoding', ''), preferences)
+    if encodage is None or request.method == 'HEAD':
+        return response
+
+    niveau = config['COMPRESS_LEVELS'][encodage]
+
+    if response.is_streamed:
+        response.response = compresser_flux(response.response, encodage, niveau)
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = encodage
+        return response
+
+    data = response.get_data()
+    if len(data) < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    cache = current_app.extensions['compression']
+    cle = None
+    compresse = None
+    if cache is not None and _est_cacheable(response):
+        cle = (encodage, niveau, hashlib.blake2b(data, digest_size=16).digest())
+        compresse = cache.get(cle)
+
+    if compresse is None:
+        compresse = compresser(data, encodage, niveau)
+        if cle is not None:
+            cache.set(cle, compresse)
+
+    response.set_data(compresse)
+    response.headers['Content-Encoding'] = encodage
+    return response
+
+
+def init_compression(app):
+    """Enregistre la compression des réponses sur l'application"""
+    taille_cache = app.config['COMPRESS_CACHE_MAX_BYTES']
+    app.extensions['compression'] = CacheCompression(taille_cache) if taille_cache else None
+    app.after_request(_compresser_reponse)
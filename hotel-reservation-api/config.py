@@ -14,8 +14,76 @@ class Config:
     DB_PORT = os.environ.get('DB_PORT') or '5432'
     DB_NAME = os.environ.get('DB_NAME') or 'hotel_reservations'
 
-    SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+    SQLALCHEMY_DATABASE_URI = (os.environ.get('DATABASE_URL')
+                               or f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Pool de connexions (par processus)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 5)
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS') or 100)
+    # Vérifie chaque connexion (SELECT 1) à sa sortie du pool : utile seulement
+    # si des connexions inactives peuvent être coupées (pare-feu, proxy)
+    DB_POOL_PRE_PING = (os.environ.get('DB_POOL_PRE_PING') or 'false').lower() == 'true'
+    # pool_size / max_overflow sont ajoutés par replicas.configurer_binds aux
+    # moteurs dont le dialecte utilise un QueuePool (pas SQLite en mémoire)
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+
     # Pagination
     ITEMS_PER_PAGE = 10
+
+    # Listes servies par des lignes légères (colonnes sérialisées) plutôt que des instances ORM
+    LEAN_READS = (os.environ.get('LEAN_READS') or 'true').lower() == 'true'
+
+    # Compression des réponses (gzip, br, zstd selon Accept-Encoding)
+    COMPRESS_ENABLED = (os.environ.get('COMPRESS_ENABLED') or 'true').lower() == 'true'
+    COMPRESS_ALGORITHMS = ['br', 'zstd', 'gzip']
+    COMPRESS_LEVELS = {
+        'gzip': int(os.environ.get('COMPRESS_LEVEL_GZIP') or 6),
+        'br': int(os.environ.get('COMPRESS_LEVEL_BR') or 4),
+        'zstd': int(os.environ.get('COMPRESS_LEVEL_ZSTD') or 3),
+    }
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE') or 500)
+    COMPRESS_MIMETYPES = ['application/json', 'text/csv', 'text/plain', 'text/html']
+    COMPRESS_CACHE_MAX_BYTES = int(os.environ.get('COMPRESS_CACHE_MAX_BYTES') or 8 * 1024 * 1024)
+
+    # Moteur tarifaire (tables de prix précompilées)
+    PRICING_HORIZON_DAYS = int(os.environ.get('PRICING_HORIZON_DAYS') or 730)
+    PRICING_CACHE_TTL = int(os.environ.get('PRICING_CACHE_TTL') or 300)
+    PRICING_MAX_NIGHTS = int(os.environ.get('PRICING_MAX_NIGHTS') or 365)
+    QUOTES_MAX_ITEMS = int(os.environ.get('QUOTES_MAX_ITEMS') or 1000)
+
+    # Maintenance des réservations (séjours terminés, archivage)
+    MAINTENANCE_BATCH_SIZE = int(os.environ.get('MAINTENANCE_BATCH_SIZE') or 500)
+    MAINTENANCE_BATCH_PAUSE = float(os.environ.get('MAINTENANCE_BATCH_PAUSE') or 0.05)
+    MAINTENANCE_INTERVAL = int(os.environ.get('MAINTENANCE_INTERVAL') or 0)  # secondes, 0 = désactivé
+    ARCHIVE_HORIZON_DAYS = int(os.environ.get('ARCHIVE_HORIZON_DAYS') or 365)
+
+    # Profil client : cache du résumé par client (secondes, 0 = désactivé) et
+    # taille maximale d'une page d'historique
+    CLIENT_PROFILE_CACHE_TTL = int(os.environ.get('CLIENT_PROFILE_CACHE_TTL') or 0)
+    HISTORY_MAX_PER_PAGE = int(os.environ.get('HISTORY_MAX_PER_PAGE') or 100)
+
+    # Opérations groupées par identifiants (?ids=1,2,3)
+    BULK_MAX_IDS = int(os.environ.get('BULK_MAX_IDS') or 1000)
+    MULTI_GET_MAX_IDS = int(os.environ.get('MULTI_GET_MAX_IDS') or 200)
+
+    # Statut des chambres (PATCH /api/chambres/status) : 'sync' = un UPDATE et un
+    # commit par appel ; 'buffered' = regroupement en mémoire, vidé toutes les
+    # ROOM_STATUS_FLUSH_MS ou dès ROOM_STATUS_FLUSH_ITEMS chambres en attente
+    ROOM_STATUS_DURABILITY = (os.environ.get('ROOM_STATUS_DURABILITY') or 'sync').lower()
+    ROOM_STATUS_FLUSH_MS = int(os.environ.get('ROOM_STATUS_FLUSH_MS') or 250)
+    ROOM_STATUS_FLUSH_ITEMS = int(os.environ.get('ROOM_STATUS_FLUSH_ITEMS') or 500)
+
+    # Réplicas en lecture (URIs séparées par des virgules, vide = primaire seule)
+    DB_REPLICA_URIS = [uri.strip() for uri in (os.environ.get('DB_REPLICA_URIS') or '').split(',')
+                       if uri.strip()]
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS') or 5)
+    REPLICA_HEALTH_INTERVAL = int(os.environ.get('REPLICA_HEALTH_INTERVAL') or 10)
+
+    # Serveur de production (server.py) ; 0 = calculé d'après les coeurs et le pool
+    WEB_BIND = os.environ.get('WEB_BIND') or '0.0.0.0:5000'
+    WEB_WORKERS = int(os.environ.get('WEB_WORKERS') or 0)
+    WEB_THREADS = int(os.environ.get('WEB_THREADS') or 0)
+    WEB_GRACEFUL_TIMEOUT = int(os.environ.get('WEB_GRACEFUL_TIMEOUT') or 30)
+    WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT') or 60)
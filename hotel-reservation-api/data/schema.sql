@@ -35,6 +35,40 @@ CREATE TABLE IF NOT EXISTS reservations (
     CONSTRAINT check_dates CHECK (date_depart > date_arrivee)
 );
 
+-- Table des réservations archivées (séjours clos depuis ARCHIVE_HORIZON_DAYS)
+CREATE TABLE IF NOT EXISTS reservations_archive (
+    id INTEGER PRIMARY KEY, -- identifiant d'origine conservé
+    client_id INTEGER NOT NULL,
+    chambre_id INTEGER NOT NULL,
+    date_arrivee DATE NOT NULL,
+    date_depart DATE NOT NULL,
+    nombre_personnes INTEGER NOT NULL,
+    prix_total DECIMAL(10, 2),
+    statut VARCHAR(20),
+    date_reservation TIMESTAMP,
+    date_archivage TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Table des tarifs (prix par nuit d'un type de chambre sur une période)
+CREATE TABLE IF NOT EXISTS tarifs (
+    id SERIAL PRIMARY KEY,
+    type_chambre VARCHAR(50) NOT NULL,
+    date_debut DATE NOT NULL,
+    date_fin DATE NOT NULL, -- incluse
+    prix_par_nuit DECIMAL(10, 2) NOT NULL,
+    jours_semaine VARCHAR(7), -- '0123456' (0 = lundi), NULL = tous les jours
+    priorite INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT check_periode CHECK (date_fin >= date_debut)
+);
+
+-- Table des remises selon la durée du séjour
+CREATE TABLE IF NOT EXISTS remises_sejour (
+    id SERIAL PRIMARY KEY,
+    type_chambre VARCHAR(50), -- NULL = tous les types
+    nuits_min INTEGER NOT NULL,
+    pourcentage DECIMAL(5, 2) NOT NULL
+);
+
 -- Table de staging pour NiFi (données brutes avant transformation)
 CREATE TABLE IF NOT EXISTS reservations_staging (
     id SERIAL PRIMARY KEY,
@@ -53,11 +87,16 @@ CREATE TABLE IF NOT EXISTS reservations_staging (
     traite BOOLEAN DEFAULT FALSE
 );
 
--- Index pour améliorer les performances
-CREATE INDEX idx_reservations_client ON reservations(client_id);
-CREATE INDEX idx_reservations_chambre ON reservations(chambre_id);
+-- Index pour améliorer les performances (déclarés aussi dans models.py)
+CREATE INDEX idx_chambres_type_disponible ON chambres(type, disponible);
+CREATE INDEX idx_reservations_client ON reservations(client_id, date_reservation);
+CREATE INDEX idx_reservations_chambre ON reservations(chambre_id, date_arrivee);
 CREATE INDEX idx_reservations_dates ON reservations(date_arrivee, date_depart);
-CREATE INDEX idx_staging_traite ON reservations_staging(traite);
+CREATE INDEX idx_reservations_date_reservation ON reservations(date_reservation);
+CREATE INDEX idx_reservations_statut_depart ON reservations(statut, date_depart);
+CREATE INDEX idx_reservations_statut_date ON reservations(statut, date_reservation DESC);
+CREATE INDEX idx_reservations_archive_client ON reservations_archive(client_id, date_reservation);
+CREATE INDEX idx_staging_traite ON reservations_staging(id) WHERE traite = false;
 
 -- Données de test pour les chambres
 INSERT INTO chambres (numero, type, prix_par_nuit, capacite) VALUES
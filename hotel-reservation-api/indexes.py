@@ -0,0 +1,83 @@
+"""
+Mise à niveau des index d'une base existante.
+
+``db.create_all()`` ne touche pas aux tables déjà créées : une base construite
+avec une ancienne version de data/schema.sql garde ses index d'origine, parfois
+sous le même nom qu'un index déclaré aujourd'hui dans models.py mais avec une
+autre définition (idx_reservations_client sur client_id seul,
+idx_staging_traite complet sur traite). ``flask creer-index`` crée les index
+absents et recrée ceux dont les colonnes, l'ordre de tri ou le caractère
+partiel diffèrent de la déclaration.
+"""
+import click
+from sqlalchemy import inspect
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from models import db
+
+
+def _definition_declaree(index, dialecte):
+    colonnes, decroissantes = [], set()
+    for expression in index.expressions:
+        if isinstance(expression, UnaryExpression) and expression.modifier is operators.desc_op:
+            expression = expression.element
+            decroissantes.add(expression.name)
+        colonnes.append(expression.name)
+    partiel = index.dialect_kwargs.get(f'{dialecte}_where') is not None
+    return colonnes, decroissantes, partiel
+
+
+def _definition_reflechie(info, dialecte):
+    decroissantes = {colonne for colonne, tri in (info.get('column_sorting') or {}).items()
+                     if 'desc' in tri}
+    partiel = f'{dialecte}_where' in (info.get('dialect_options') or {})
+    return list(info['column_names']), decroissantes, partiel
+
+
+def _identiques(declaree, reflechie, dialecte):
+    colonnes, decroissantes, partiel = declaree
+    colonnes_bd, decroissantes_bd, partiel_bd = reflechie
+    if colonnes != colonnes_bd or partiel != partiel_bd:
+        return False
+    # SQLite ne restitue pas l'ordre de tri des colonnes d'un index
+    return dialecte == 'sqlite' or decroissantes == decroissantes_bd
+
+
+def mettre_a_niveau_index():
+    """Crée les index absents et recrée ceux qui diffèrent ; renvoie (créés, recréés)"""
+    dialecte = db.engine.dialect.name
+    crees, recrees = [], []
+
+    with db.engine.begin() as connexion:
+        inspecteur = inspect(connexion)
+        tables = set(inspecteur.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existants = {info['name']: info for info in inspecteur.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                info = existants.get(index.name)
+                if info is None:
+                    index.create(bind=connexion)
+                    crees.append(index.name)
+                elif not _identiques(_definition_declaree(index, dialecte),
+                                     _definition_reflechie(info, dialecte), dialecte):
+                    index.drop(bind=connexion)
+                    index.create(bind=connexion)
+                    recrees.append(index.name)
+    return crees, recrees
+
+
+def init_indexes(app):
+    """Enregistre la commande ``flask creer-index``"""
+    @app.cli.command('creer-index')
+    def creer_index_command():
+        """Crée les index manquants et recrée ceux dont la définition a changé"""
+        crees, recrees = mettre_a_niveau_index()
+        if crees:
+            click.echo(f"Index créés : {', '.join(crees)}")
+        if recrees:
+            click.echo(f"Index recréés : {', '.join(recrees)}")
+        if not crees and not recrees:
+            click.echo('Index à jour')
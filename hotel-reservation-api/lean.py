@@ -0,0 +1,143 @@
+"""
+Lectures légères pour les routes de liste (LEAN_READS).
+
+Au lieu d'instances ORM (identity map, état de session, chargement paresseux),
+les listes sélectionnent uniquement les colonnes sérialisées dans des lignes à
+``__slots__``, passées telles quelles aux schémas Marshmallow existants : le
+JSON produit est identique à celui du chemin ORM. Les colonnes de chaque type
+de ligne sont déduites des champs du schéma correspondant.
+"""
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import func, select
+
+from models import (
+    db, Client, Chambre, Reservation, ReservationArchive, chambres_schema, clients_schema,
+    reservations_schema, reservations_archive_schema
+)
+
+
+class Ligne:
+    """Ligne en lecture seule, sans lien avec la session"""
+    __slots__ = ()
+    colonnes = ()
+
+    def __init__(self, *valeurs):
+        for nom, valeur in zip(self.__slots__, valeurs):
+            setattr(self, nom, valeur)
+
+
+def classe_ligne(nom, modele, schema, imbriques=()):
+    """Classe à __slots__ pour les colonnes de modele sérialisées par schema"""
+    noms = [champ for champ in schema.dump_fields if champ in modele.__table__.columns]
+    classe = type(nom, (Ligne,), {'__slots__': tuple(noms) + tuple(imbriques)})
+    classe.colonnes = tuple(getattr(modele, champ) for champ in noms)
+    return classe
+
+
+LigneChambre = classe_ligne('LigneChambre', Chambre, chambres_schema)
+LigneClient = classe_ligne('LigneClient', Client, clients_schema, ('reservations',))
+LigneReservation = classe_ligne('LigneReservation', Reservation, reservations_schema,
+                                ('client', 'chambre'))
+LigneArchive = classe_ligne('LigneArchive', ReservationArchive, reservations_archive_schema)
+
+
+class PaginationLegere(Pagination):
+    """Pagination d'un select() de colonnes, convertie en lignes par ``construire``"""
+
+    def _query_items(self):
+        requete = self._query_args['requete'].limit(self.per_page).offset(self._query_offset)
+        return self._query_args['construire'](db.session.execute(requete).all())
+
+    def _query_count(self):
+        return db.session.execute(self._query_args['compter']).scalar()
+
+
+def _paginer(requete, compter, construire, page, per_page):
+    return PaginationLegere(page=page, per_page=per_page, max_per_page=None, error_out=False,
+                            requete=requete, compter=compter, construire=construire)
+
+
+def lister_chambres(type_chambre=None, disponible=None):
+    requete = select(*LigneChambre.colonnes)
+    if type_chambre:
+        requete = requete.where(Chambre.type == type_chambre)
+    if disponible is not None:
+        requete = requete.where(Chambre.disponible == disponible)
+    return [LigneChambre(*ligne) for ligne in db.session.execute(requete)]
+
+
+def _reservations_des_clients(clients):
+    """Attache à chaque client ses réservations (et leur chambre) en une requête"""
+    for client in clients:
+        client.reservations = []
+    if not clients:
+        return clients
+
+    par_id = {client.id: client for client in clients}
+    taille = len(LigneReservation.colonnes)
+    chambres = {}
+    requete = select(*LigneReservation.colonnes, *LigneChambre.colonnes) \
+        .join(Chambre, Chambre.id == Reservation.chambre_id) \
+        .where(Reservation.client_id.in_(list(par_id))) \
+        .order_by(Reservation.id)
+
+    for ligne in db.session.execute(requete):
+        reservation = LigneReservation(*ligne[:taille])
+        chambre_id = reservation.chambre_id
+        if chambre_id not in chambres:
+            chambres[chambre_id] = LigneChambre(*ligne[taille:])
+        reservation.chambre = chambres[chambre_id]
+        par_id[reservation.client_id].reservations.append(reservation)
+    return clients
+
+
+def paginer_clients(page, per_page):
+    """Page de clients avec leurs réservations, comme clients_schema"""
+    return _paginer(
+        select(*LigneClient.colonnes).order_by(Client.id),
+        select(func.count()).select_from(Client),
+        lambda lignes: _reservations_des_clients([LigneClient(*ligne) for ligne in lignes]),
+        page, per_page
+    )
+
+
+def _construire_reservations(lignes):
+    n_reservation = len(LigneReservation.colonnes)
+    n_client = n_reservation + len(LigneClient.colonnes)
+    clients, chambres, reservations = {}, {}, []
+
+    for ligne in lignes:
+        reservation = LigneReservation(*ligne[:n_reservation])
+        if reservation.client_id not in clients:
+            clients[reservation.client_id] = LigneClient(*ligne[n_reservation:n_client])
+        if reservation.chambre_id not in chambres:
+            chambres[reservation.chambre_id] = LigneChambre(*ligne[n_client:])
+        reservation.client = clients[reservation.client_id]
+        reservation.chambre = chambres[reservation.chambre_id]
+        reservations.append(reservation)
+    return reservations
+
+
+def paginer_reservations(page, per_page, statut=None, client_id=None, archive=False):
+    """Page de réservations (client et chambre imbriqués) ou d'archives"""
+    modele = ReservationArchive if archive else Reservation
+    filtres = []
+    if statut:
+        filtres.append(modele.statut == statut)
+    if client_id:
+        filtres.append(modele.client_id == client_id)
+
+    if archive:
+        requete = select(*LigneArchive.colonnes)
+        construire = lambda lignes: [LigneArchive(*ligne) for ligne in lignes]  # noqa: E731
+    else:
+        requete = select(*LigneReservation.colonnes, *LigneClient.colonnes, *LigneChambre.colonnes) \
+            .join(Client, Client.id == Reservation.client_id) \
+            .join(Chambre, Chambre.id == Reservation.chambre_id)
+        construire = _construire_reservations
+
+    return _paginer(
+        requete.where(*filtres).order_by(modele.date_reservation.desc(), modele.id.desc()),
+        select(func.count()).select_from(modele).where(*filtres),
+        construire, page, per_page
+    )
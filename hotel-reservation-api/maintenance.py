@@ -0,0 +1,196 @@
+"""
+Maintenance des réservations : passage des séjours terminés au statut
+'terminee' et archivage des réservations anciennes.
+
+Les deux traitements avancent par lots bornés, chacun validé par son propre
+commit, pour garder des verrous courts sur la table ``reservations``.
+Exécution ponctuelle via ``flask maintenance`` ou périodique via
+PlanificateurMaintenance (MAINTENANCE_INTERVAL).
+"""
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import click
+from sqlalchemy import insert, literal, select
+
+from models import db, Reservation, ReservationArchive
+
+logger = logging.getLogger(__name__)
+
+STATUTS_ARCHIVABLES = ('terminee', 'annulee')
+
+metriques = {
+    'executions': 0,
+    'derniere_execution': None,
+    'derniere_duree_ms': None,
+    'derniere_erreur': None,
+    'sejours_termines': 0,
+    'reservations_archivees': 0,
+    'lots': 0,
+    'pid_planificateur': None
+}
+_verrou_metriques = threading.Lock()
+
+
+def _compter(**increments):
+    with _verrou_metriques:
+        for cle, valeur in increments.items():
+            metriques[cle] += valeur
+
+
+def terminer_sejours(taille_lot=500, pause=0.0, aujourd_hui=None, progression=None):
+    """Passe à 'terminee' les réservations confirmées dont le départ est passé"""
+    aujourd_hui = aujourd_hui or date.today()
+    total = 0
+
+    # Pas d'ORDER BY : chaque lot sort du filtre une fois traité, et un tri sur
+    # la clé primaire détournerait le planificateur de idx_reservations_statut_depart
+    while True:
+        ids = db.session.scalars(
+            select(Reservation.id)
+            .where(Reservation.statut == 'confirmee', Reservation.date_depart < aujourd_hui)
+            .limit(taille_lot)
+        ).all()
+        if not ids:
+            break
+
+        Reservation.query.filter(Reservation.id.in_(ids)).update(
+            {Reservation.statut: 'terminee'}, synchronize_session=False
+        )
+        db.session.commit()
+
+        total += len(ids)
+        _compter(sejours_termines=len(ids), lots=1)
+        if progression:
+            progression('terminer', len(ids), total)
+        if len(ids) < taille_lot:
+            break
+        if pause:
+            time.sleep(pause)
+
+    return total
+
+
+def archiver_reservations(horizon_jours=365, taille_lot=500, pause=0.0, aujourd_hui=None,
+                          progression=None):
+    """Déplace vers reservations_archive les séjours clos depuis plus de horizon_jours"""
+    limite = (aujourd_hui or date.today()) - timedelta(days=horizon_jours)
+    colonnes = ['id', 'client_id', 'chambre_id', 'date_arrivee', 'date_depart',
+                'nombre_personnes', 'prix_total', 'statut', 'date_reservation']
+    total = 0
+
+    while True:
+        ids = db.session.scalars(
+            select(Reservation.id)
+            .where(Reservation.statut.in_(STATUTS_ARCHIVABLES), Reservation.date_depart < limite)
+            .limit(taille_lot)
+        ).all()
+        if not ids:
+            break
+
+        db.session.execute(
+            insert(ReservationArchive).from_select(
+                colonnes + ['date_archivage'],
+                select(*[getattr(Reservation, c) for c in colonnes],
+                       literal(datetime.utcnow(), ReservationArchive.date_archivage.type))
+                .where(Reservation.id.in_(ids))
+            )
+        )
+        Reservation.query.filter(Reservation.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+        total += len(ids)
+        _compter(reservations_archivees=len(ids), lots=1)
+        if progression:
+            progression('archiver', len(ids), total)
+        if len(ids) < taille_lot:
+            break
+        if pause:
+            time.sleep(pause)
+
+    return total
+
+
+def executer_maintenance(config, progression=None):
+    """Exécute les deux traitements avec les réglages de la configuration"""
+    debut = time.perf_counter()
+    taille_lot = config['MAINTENANCE_BATCH_SIZE']
+    pause = config['MAINTENANCE_BATCH_PAUSE']
+
+    try:
+        termines = terminer_sejours(taille_lot, pause, progression=progression)
+        archivees = archiver_reservations(config['ARCHIVE_HORIZON_DAYS'], taille_lot, pause,
+                                          progression=progression)
+    except Exception as err:
+        db.session.rollback()
+        with _verrou_metriques:
+            metriques['derniere_erreur'] = str(err)
+        raise
+    finally:
+        duree = (time.perf_counter() - debut) * 1000
+        with _verrou_metriques:
+            metriques['executions'] += 1
+            metriques['derniere_execution'] = datetime.utcnow().isoformat()
+            metriques['derniere_duree_ms'] = round(duree, 1)
+
+    logger.info('Maintenance : %d séjours terminés, %d réservations archivées en %.0f ms',
+                termines, archivees, duree)
+    return {'sejours_termines': termines, 'reservations_archivees': archivees,
+            'duree_ms': round(duree, 1)}
+
+
+class PlanificateurMaintenance(threading.Thread):
+    """Thread qui exécute la maintenance à intervalle régulier"""
+
+    def __init__(self, app, intervalle):
+        super().__init__(name='maintenance', daemon=True)
+        self.app = app
+        self.intervalle = intervalle
+        self._arret = threading.Event()
+
+    def run(self):
+        # Sous server.py, ce thread vit dans le processus maître : les workers
+        # héritent de ce pid mais leurs compteurs restent à zéro
+        with _verrou_metriques:
+            metriques['pid_planificateur'] = os.getpid()
+        while not self._arret.wait(self.intervalle):
+            with self.app.app_context():
+                try:
+                    executer_maintenance(self.app.config)
+                except Exception:
+                    logger.exception('Échec de la maintenance planifiée')
+                finally:
+                    db.session.remove()
+
+    def arreter(self):
+        self._arret.set()
+
+
+def init_maintenance(app):
+    """Enregistre la commande ``flask maintenance`` et le planificateur éventuel"""
+    @app.cli.command('maintenance')
+    @click.option('--taille-lot', type=int, default=None, help='Réservations par lot')
+    @click.option('--horizon', type=int, default=None, help="Âge (jours) avant archivage")
+    def maintenance_command(taille_lot, horizon):
+        """Termine les séjours passés et archive les anciennes réservations"""
+        if taille_lot:
+            app.config['MAINTENANCE_BATCH_SIZE'] = taille_lot
+        if horizon is not None:
+            app.config['ARCHIVE_HORIZON_DAYS'] = horizon
+
+        def afficher(etape, lot, total):
+            click.echo(f'{etape} : lot de {lot} (total {total})')
+
+        resultat = executer_maintenance(app.config, progression=afficher)
+        click.echo(f"{resultat['sejours_termines']} séjours terminés, "
+                   f"{resultat['reservations_archivees']} réservations archivées "
+                   f"en {resultat['duree_ms']} ms")
+
+    intervalle = app.config['MAINTENANCE_INTERVAL']
+    if intervalle > 0:
+        planificateur = PlanificateurMaintenance(app, intervalle)
+        planificateur.start()
+        app.extensions['maintenance'] = planificateur
@@ -1,8 +1,22 @@
+import sqlite3
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from replicas import SessionRoutee
 from datetime import datetime
-from marshmallow import Schema, fields, validate
+from marshmallow import Schema, fields, validate, validates_schema, ValidationError
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': SessionRoutee})
+
+
+@event.listens_for(Engine, 'connect')
+def _activer_cles_etrangeres(dbapi_connection, connection_record):
+    """SQLite n'applique ON DELETE CASCADE qu'avec foreign_keys activé"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
 
 
 class Client(db.Model):
@@ -17,7 +31,9 @@ class Client(db.Model):
     date_creation = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relations
-    reservations = db.relationship('Reservation', backref='client', lazy=True, cascade='all, delete-orphan')
+    reservations = db.relationship('Reservation', backref='client', lazy=True,
+                                   order_by='Reservation.id',
+                                   cascade='all, delete-orphan', passive_deletes=True)
 
     def __repr__(self):
         return f'<Client {self.prenom} {self.nom}>'
@@ -26,6 +42,9 @@ class Client(db.Model):
 class Chambre(db.Model):
     """Modèle Chambre"""
     __tablename__ = 'chambres'
+    __table_args__ = (
+        db.Index('idx_chambres_type_disponible', 'type', 'disponible'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     numero = db.Column(db.String(10), unique=True, nullable=False)
@@ -35,7 +54,8 @@ class Chambre(db.Model):
     disponible = db.Column(db.Boolean, default=True)
 
     # Relations
-    reservations = db.relationship('Reservation', backref='chambre', lazy=True)
+    reservations = db.relationship('Reservation', backref='chambre', lazy=True,
+                                   cascade='all, delete-orphan', passive_deletes=True)
 
     def __repr__(self):
         return f'<Chambre {self.numero} - {self.type}>'
@@ -44,10 +64,19 @@ class Chambre(db.Model):
 class Reservation(db.Model):
     """Modèle Réservation"""
     __tablename__ = 'reservations'
+    __table_args__ = (
+        db.Index('idx_reservations_client', 'client_id', 'date_reservation'),
+        db.Index('idx_reservations_chambre', 'chambre_id', 'date_arrivee'),
+        db.Index('idx_reservations_dates', 'date_arrivee', 'date_depart'),
+        db.Index('idx_reservations_date_reservation', 'date_reservation'),
+        db.Index('idx_reservations_statut_depart', 'statut', 'date_depart'),
+        # Pas de réutilisation d'identifiants sous SQLite (ids conservés à l'archivage)
+        {'sqlite_autoincrement': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
-    chambre_id = db.Column(db.Integer, db.ForeignKey('chambres.id'), nullable=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id', ondelete='CASCADE'), nullable=False)
+    chambre_id = db.Column(db.Integer, db.ForeignKey('chambres.id', ondelete='CASCADE'), nullable=False)
     date_arrivee = db.Column(db.Date, nullable=False)
     date_depart = db.Column(db.Date, nullable=False)
     nombre_personnes = db.Column(db.Integer, nullable=False)
@@ -59,6 +88,61 @@ class Reservation(db.Model):
         return f'<Reservation {self.id} - {self.statut}>'
 
 
+# Filtre par statut trié par date de réservation décroissante (GET /api/reservations)
+db.Index('idx_reservations_statut_date', Reservation.statut, Reservation.date_reservation.desc())
+
+
+class ReservationArchive(db.Model):
+    """Modèle Réservation archivée (séjours anciens sortis de la table active)"""
+    __tablename__ = 'reservations_archive'
+    __table_args__ = (
+        db.Index('idx_reservations_archive_client', 'client_id', 'date_reservation'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    client_id = db.Column(db.Integer, nullable=False)
+    chambre_id = db.Column(db.Integer, nullable=False)
+    date_arrivee = db.Column(db.Date, nullable=False)
+    date_depart = db.Column(db.Date, nullable=False)
+    nombre_personnes = db.Column(db.Integer, nullable=False)
+    prix_total = db.Column(db.Numeric(10, 2))
+    statut = db.Column(db.String(20))
+    date_reservation = db.Column(db.DateTime)
+    date_archivage = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ReservationArchive {self.id} - {self.statut}>'
+
+
+class Tarif(db.Model):
+    """Modèle Tarif (prix par nuit d'un type de chambre sur une période)"""
+    __tablename__ = 'tarifs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    type_chambre = db.Column(db.String(50), nullable=False)
+    date_debut = db.Column(db.Date, nullable=False)
+    date_fin = db.Column(db.Date, nullable=False)  # incluse
+    prix_par_nuit = db.Column(db.Numeric(10, 2), nullable=False)
+    jours_semaine = db.Column(db.String(7))  # '0123456' (0 = lundi), NULL = tous les jours
+    priorite = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<Tarif {self.type_chambre} {self.date_debut} - {self.date_fin}>'
+
+
+class RemiseSejour(db.Model):
+    """Modèle Remise selon la durée du séjour"""
+    __tablename__ = 'remises_sejour'
+
+    id = db.Column(db.Integer, primary_key=True)
+    type_chambre = db.Column(db.String(50))  # NULL = tous les types
+    nuits_min = db.Column(db.Integer, nullable=False)
+    pourcentage = db.Column(db.Numeric(5, 2), nullable=False)
+
+    def __repr__(self):
+        return f'<RemiseSejour {self.nuits_min} nuits - {self.pourcentage}%>'
+
+
 class ReservationStaging(db.Model):
     """Modèle Staging pour données NiFi"""
     __tablename__ = 'reservations_staging'
@@ -79,6 +163,12 @@ class ReservationStaging(db.Model):
     traite = db.Column(db.Boolean, default=False)
 
 
+# Index partiel : seules les lignes restant à traiter sont indexées
+db.Index('idx_staging_traite', ReservationStaging.id,
+         postgresql_where=ReservationStaging.traite == db.false(),
+         sqlite_where=ReservationStaging.traite == db.false())
+
+
 # Schémas Marshmallow pour sérialisation
 
 class ClientSchema(Schema):
@@ -119,10 +209,97 @@ class ReservationSchema(Schema):
     chambre = fields.Nested(ChambreSchema)
 
 
+class ReservationArchiveSchema(Schema):
+    """Schéma de sérialisation Réservation archivée"""
+    id = fields.Int()
+    client_id = fields.Int()
+    chambre_id = fields.Int()
+    date_arrivee = fields.Date()
+    date_depart = fields.Date()
+    nombre_personnes = fields.Int()
+    prix_total = fields.Decimal(as_string=True)
+    statut = fields.Str()
+    date_reservation = fields.DateTime()
+    date_archivage = fields.DateTime()
+
+
+class TarifSchema(Schema):
+    """Schéma de sérialisation Tarif"""
+    id = fields.Int(dump_only=True)
+    type_chambre = fields.Str(required=True, validate=validate.OneOf(['Simple', 'Double', 'Suite']))
+    date_debut = fields.Date(required=True)
+    date_fin = fields.Date(required=True)
+    prix_par_nuit = fields.Decimal(required=True, as_string=True, validate=validate.Range(min=0))
+    jours_semaine = fields.Str(allow_none=True, validate=validate.Regexp(r'^[0-6]{1,7}$'))
+    priorite = fields.Int()
+
+    @validates_schema
+    def valider_periode(self, data, **kwargs):
+        if 'date_debut' in data and 'date_fin' in data and data['date_fin'] < data['date_debut']:
+            raise ValidationError('date_fin doit être postérieure ou égale à date_debut', 'date_fin')
+
+
+class RemiseSejourSchema(Schema):
+    """Schéma de sérialisation Remise séjour"""
+    id = fields.Int(dump_only=True)
+    type_chambre = fields.Str(allow_none=True, validate=validate.OneOf(['Simple', 'Double', 'Suite']))
+    nuits_min = fields.Int(required=True, validate=validate.Range(min=1))
+    pourcentage = fields.Decimal(required=True, as_string=True, validate=validate.Range(min=0, max=100))
+
+
+class DemandeDevisSchema(Schema):
+    """Schéma d'une demande de devis (chambre précise ou type de chambre)"""
+    chambre_id = fields.Int()
+    type = fields.Str(validate=validate.OneOf(['Simple', 'Double', 'Suite']))
+    date_arrivee = fields.Date(required=True)
+    date_depart = fields.Date(required=True)
+    nombre_personnes = fields.Int(load_default=1, validate=validate.Range(min=1))
+
+    @validates_schema
+    def valider_demande(self, data, **kwargs):
+        if ('chambre_id' in data) == ('type' in data):
+            raise ValidationError('Indiquer soit chambre_id, soit type')
+        if ('date_arrivee' in data and 'date_depart' in data
+                and data['date_depart'] <= data['date_arrivee']):
+            raise ValidationError("date_depart doit être postérieure à date_arrivee", 'date_depart')
+        max_nuits = current_app.config['PRICING_MAX_NIGHTS']
+        if ('date_arrivee' in data and 'date_depart' in data and max_nuits
+                and (data['date_depart'] - data['date_arrivee']).days > max_nuits):
+            raise ValidationError(f'Séjour limité à {max_nuits} nuits', 'date_depart')
+
+
+class ResumeClientSchema(Schema):
+    """Schéma du résumé des séjours d'un client (GET /api/clients/<id>)"""
+    nombre_sejours = fields.Int()
+    depense_totale = fields.Decimal(as_string=True)
+    dernier_sejour = fields.Date(allow_none=True)
+    sejours_a_venir = fields.Int()
+    prochain_sejour = fields.Date(allow_none=True)
+    annulations = fields.Int()
+
+
+class StatutChambreSchema(Schema):
+    """Schéma d'un changement de disponibilité (PATCH /api/chambres/status)"""
+    id = fields.Int(required=True)
+    disponible = fields.Bool(required=True)
+
+
 # Instanciation des schémas
 client_schema = ClientSchema()
 clients_schema = ClientSchema(many=True)
+clients_simples_schema = ClientSchema(many=True, exclude=('reservations',))
+client_simple_schema = ClientSchema(exclude=('reservations',))
+resume_client_schema = ResumeClientSchema()
 chambre_schema = ChambreSchema()
 chambres_schema = ChambreSchema(many=True)
 reservation_schema = ReservationSchema()
-reservations_schema = ReservationSchema(many=True)
\ No newline at end of file
+reservations_schema = ReservationSchema(many=True)
+reservations_simples_schema = ReservationSchema(many=True, exclude=('client', 'chambre'))
+reservations_client_schema = ReservationSchema(many=True, exclude=('client',))
+reservations_archive_schema = ReservationArchiveSchema(many=True)
+tarif_schema = TarifSchema()
+tarifs_schema = TarifSchema(many=True)
+remise_schema = RemiseSejourSchema()
+remises_schema = RemiseSejourSchema(many=True)
+demandes_devis_schema = DemandeDevisSchema(many=True)
+statuts_chambres_schema = StatutChambreSchema(many=True)
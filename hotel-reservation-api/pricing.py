@@ -0,0 +1,273 @@
+"""
+Moteur tarifaire : tarifs saisonniers / jours de semaine et remises séjour.
+
+Les tarifs sont compilés en mémoire, pour chaque chambre, en un tableau de prix
+par nuit (en centimes) sur un horizon glissant, accompagné de ses sommes
+cumulées : le prix d'un séjour est alors une simple différence de deux valeurs,
+calculée en arithmétique entière puis convertie en Decimal exact.
+"""
+import threading
+import time
+from array import array
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models import db, Chambre, Tarif, RemiseSejour
+
+Devis = namedtuple('Devis', ['nb_nuits', 'sous_total', 'remise_pourcentage', 'prix_total'])
+
+CENTIMES = Decimal('0.01')
+
+
+def en_centimes(montant):
+    """Convertit un montant Decimal/Numeric en centimes entiers"""
+    return int(Decimal(montant).quantize(CENTIMES, rounding=ROUND_HALF_UP) * 100)
+
+
+def en_decimal(centimes):
+    """Convertit des centimes entiers en Decimal à deux décimales"""
+    return Decimal(centimes).scaleb(-2)
+
+
+def _charger_tarifs(*criteres):
+    """Périodes tarifaires par type de chambre, par priorité croissante"""
+    tarifs = {}
+    for tarif in Tarif.query.filter(*criteres).order_by(Tarif.priorite, Tarif.id).all():
+        tarifs.setdefault(tarif.type_chambre, []).append((
+            tarif.date_debut, tarif.date_fin, en_centimes(tarif.prix_par_nuit),
+            set(int(j) for j in tarif.jours_semaine) if tarif.jours_semaine else None
+        ))
+    return tarifs
+
+
+def _charger_remises():
+    return [
+        (r.type_chambre, r.nuits_min, en_centimes(r.pourcentage))
+        for r in RemiseSejour.query.all()
+    ]
+
+
+def _prix_nuit(periodes, prix_base, jour):
+    """Prix d'une nuit par calcul direct : le dernier tarif applicable l'emporte"""
+    prix = prix_base
+    for debut, fin, centimes, jours in periodes:
+        if debut <= jour <= fin and (jours is None or jour.weekday() in jours):
+            prix = centimes
+    return prix
+
+
+def _remise(remises, type_chambre, nb_nuits):
+    """Remise (en centièmes de pourcent) de la règle séjour applicable"""
+    meilleure = (0, 0)
+    for type_remise, nuits_min, pourcentage in remises:
+        if nb_nuits >= nuits_min and type_remise in (None, type_chambre):
+            meilleure = max(meilleure, (nuits_min, pourcentage))
+    return meilleure[1]
+
+
+def _devis(nb_nuits, sous_total, remise):
+    total = sous_total - (sous_total * remise + 5000) // 10000
+    return Devis(
+        nb_nuits=nb_nuits,
+        sous_total=en_decimal(sous_total),
+        remise_pourcentage=en_decimal(remise),
+        prix_total=en_decimal(total)
+    )
+
+
+class _Table:
+    """Prix par nuit d'une chambre sur l'horizon, avec sommes cumulées"""
+    __slots__ = ('type_chambre', 'prix_base', 'cumuls')
+
+    def __init__(self, type_chambre, prix_base, cumuls):
+        self.type_chambre = type_chambre
+        self.prix_base = prix_base
+        self.cumuls = cumuls
+
+
+class MoteurTarifaire:
+    """Calcule le prix des séjours à partir des tables précompilées"""
+
+    def __init__(self, horizon_jours=730, ttl=300, max_nuits=365):
+        self.horizon_jours = horizon_jours
+        self.ttl = ttl
+        self.max_nuits = max_nuits
+        self._verrou = threading.RLock()
+        self._tables = None
+        self._origine = None
+        self._tarifs = {}
+        self._remises = []
+        self._construit_a = 0.0
+
+    def init_app(self, app):
+        self.horizon_jours = app.config['PRICING_HORIZON_DAYS']
+        self.ttl = app.config['PRICING_CACHE_TTL']
+        self.max_nuits = app.config['PRICING_MAX_NIGHTS']
+        app.extensions['pricing'] = self
+
+    def invalider(self):
+        """Force la reconstruction des tables au prochain devis"""
+        self._tables = None
+
+    def _a_jour(self):
+        return (self._origine == date.today()
+                and (not self.ttl or time.monotonic() - self._construit_a < self.ttl))
+
+    def _tables_a_jour(self, forcer=False):
+        tables = self._tables
+        if tables is not None and not forcer and self._a_jour():
+            return tables
+        with self._verrou:
+            if forcer or self._tables is None or not self._a_jour():
+                self.construire()
+            return self._tables
+
+    def construire(self):
+        """(Re)compile les tables de prix à partir de la base"""
+        origine = date.today()
+        horizon = self.horizon_jours
+
+        tarifs = _charger_tarifs()
+        remises = _charger_remises()
+
+        # Prix imposés par les tarifs, par type de chambre (-1 = prix de base)
+        imposes = {}
+        for type_chambre, periodes in tarifs.items():
+            prix = array('q', [-1]) * horizon
+            for debut, fin, centimes, jours in periodes:
+                premier = max((debut - origine).days, 0)
+                dernier = min((fin - origine).days, horizon - 1)
+                for jour in range(premier, dernier + 1):
+                    if jours is None or (origine.weekday() + jour) % 7 in jours:
+                        prix[jour] = centimes
+            imposes[type_chambre] = prix
+
+        # Les chambres de même type et même prix de base partagent leur table
+        partagees = {}
+        tables = {}
+        for chambre_id, type_chambre, prix_par_nuit in db.session.query(
+                Chambre.id, Chambre.type, Chambre.prix_par_nuit):
+            base = en_centimes(prix_par_nuit)
+            cle = (type_chambre, base)
+            if cle not in partagees:
+                prix = imposes.get(type_chambre)
+                cumuls = array('q', [0]) * (horizon + 1)
+                total = 0
+                for jour in range(horizon):
+                    total += base if prix is None or prix[jour] < 0 else prix[jour]
+                    cumuls[jour + 1] = total
+                partagees[cle] = cumuls
+            tables[chambre_id] = _Table(type_chambre, base, partagees[cle])
+
+        with self._verrou:
+            self._tarifs = tarifs
+            self._remises = remises
+            self._origine = origine
+            self._construit_a = time.monotonic()
+            self._tables = tables
+
+    def valider_sejour(self, date_arrivee, date_depart):
+        """Nombre de nuits du séjour ; lève ValueError s'il est nul ou trop long"""
+        nb_nuits = (date_depart - date_arrivee).days
+        if nb_nuits <= 0:
+            raise ValueError("La date de départ doit être postérieure à la date d'arrivée")
+        if self.max_nuits and nb_nuits > self.max_nuits:
+            raise ValueError(f'Séjour limité à {self.max_nuits} nuits')
+        return nb_nuits
+
+    def sous_total_centimes(self, table, date_arrivee, date_depart):
+        """Somme des prix des nuits [date_arrivee, date_depart[ en centimes"""
+        debut = (date_arrivee - self._origine).days
+        fin = (date_depart - self._origine).days
+        if 0 <= debut and fin <= self.horizon_jours:
+            return table.cumuls[fin] - table.cumuls[debut]
+        # Hors horizon : calcul direct, plus lent
+        periodes = self._tarifs.get(table.type_chambre, ())
+        return sum(
+            _prix_nuit(periodes, table.prix_base, date_arrivee + timedelta(days=n))
+            for n in range(fin - debut)
+        )
+
+    def table(self, chambre_id):
+        """Table de prix d'une chambre (reconstruit le cache si nécessaire)"""
+        table = self._tables_a_jour().get(chambre_id)
+        if table is None:
+            # Chambre créée depuis la dernière compilation
+            table = self._tables_a_jour(forcer=True).get(chambre_id)
+        return table
+
+    def devis(self, chambre_id, date_arrivee, date_depart):
+        """Calcule le prix d'un séjour ; lève ValueError si les dates sont invalides"""
+        self.valider_sejour(date_arrivee, date_depart)
+
+        table = self.table(chambre_id)
+        if table is None:
+            raise LookupError(f'Chambre {chambre_id} introuvable')
+        return self.devis_table(table, date_arrivee, date_depart)
+
+    def devis_table(self, table, date_arrivee, date_depart):
+        """Devis à partir d'une table déjà obtenue (dates supposées valides)"""
+        nb_nuits = (date_depart - date_arrivee).days
+        sous_total = self.sous_total_centimes(table, date_arrivee, date_depart)
+        return _devis(nb_nuits, sous_total, _remise(self._remises, table.type_chambre, nb_nuits))
+
+    def devis_exact(self, chambre, date_arrivee, date_depart):
+        """Devis calculé directement depuis la base, sans les tables en cache.
+
+        Sert au prix enregistré d'une réservation : les tables d'un processus
+        ne sont invalidées que par ses propres commits, un autre worker a pu
+        modifier tarifs, remises ou prix de la chambre depuis (jusqu'à
+        PRICING_CACHE_TTL secondes).
+        """
+        nb_nuits = self.valider_sejour(date_arrivee, date_depart)
+        periodes = _charger_tarifs(
+            Tarif.type_chambre == chambre.type,
+            Tarif.date_debut < date_depart,
+            Tarif.date_fin >= date_arrivee
+        ).get(chambre.type, ())
+        base = en_centimes(chambre.prix_par_nuit)
+        sous_total = sum(
+            _prix_nuit(periodes, base, date_arrivee + timedelta(days=n))
+            for n in range(nb_nuits)
+        )
+        return _devis(nb_nuits, sous_total, _remise(_charger_remises(), chambre.type, nb_nuits))
+
+
+moteur = MoteurTarifaire()
+
+_CHAMPS_CHAMBRE = ('type', 'prix_par_nuit')
+
+
+def _modifie_tarifs(session):
+    for obj in session.new | session.deleted:
+        if isinstance(obj, (Tarif, RemiseSejour, Chambre)):
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, (Tarif, RemiseSejour)):
+            return True
+        if isinstance(obj, Chambre):
+            etat = inspect(obj)
+            if any(etat.attrs[champ].history.has_changes() for champ in _CHAMPS_CHAMBRE):
+                return True
+    return False
+
+
+@event.listens_for(Session, 'before_flush')
+def _avant_flush(session, flush_context, instances):
+    if _modifie_tarifs(session):
+        session.info['tarifs_modifies'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _apres_commit(session):
+    if session.info.pop('tarifs_modifies', False):
+        moteur.invalider()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _apres_rollback(session, previous_transaction):
+    session.info.pop('tarifs_modifies', None)
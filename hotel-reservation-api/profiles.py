@@ -0,0 +1,180 @@
+"""
+Profil client : résumé agrégé des séjours et historique paginé par curseur.
+
+Le résumé (séjours, dépense, dernier et prochain séjour) est calculé par une
+seule requête groupée sur les réservations actives et archivées du client, et
+peut être conservé CLIENT_PROFILE_CACHE_TTL secondes par client ; le cache est
+invalidé au commit de toute écriture ORM sur une réservation du client.
+
+L'historique est paginé par jeu de clés (date_reservation, id) décroissant : un
+curseur opaque désigne la dernière ligne renvoyée, si bien que le coût d'une
+page ne dépend ni de sa position ni de la longueur de l'historique. Les lignes
+sans date_reservation (imports, archives anciennes) viennent en dernier, par id
+décroissant, quel que soit le placement des NULL propre au SGBD.
+"""
+import base64
+import json
+import threading
+import time
+from datetime import date, datetime
+
+from sqlalchemy import event, func, inspect, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from models import db, Reservation, ReservationArchive
+
+
+class CacheProfils:
+    """Résumés par client, expirés après ttl secondes"""
+
+    def __init__(self, ttl=0):
+        self.ttl = ttl
+        self._verrou = threading.Lock()
+        self._resumes = {}
+
+    def init_app(self, app):
+        self.ttl = app.config['CLIENT_PROFILE_CACHE_TTL']
+        app.extensions['profils'] = self
+
+    def lire(self, client_id):
+        if not self.ttl:
+            return None
+        with self._verrou:
+            entree = self._resumes.get(client_id)
+        if entree is None or time.monotonic() - entree[0] >= self.ttl:
+            return None
+        return entree[1]
+
+    def ecrire(self, client_id, resume):
+        if self.ttl:
+            with self._verrou:
+                self._resumes[client_id] = (time.monotonic(), resume)
+
+    def invalider(self, client_ids=None):
+        """Oublie les résumés des clients indiqués (tous si None)"""
+        with self._verrou:
+            if client_ids is None:
+                self._resumes.clear()
+            else:
+                for client_id in client_ids:
+                    self._resumes.pop(client_id, None)
+
+
+profils = CacheProfils()
+
+
+def calculer_resume(client_id, aujourd_hui=None):
+    """Agrégats des séjours du client (réservations actives et archivées)"""
+    aujourd_hui = aujourd_hui or date.today()
+    sejours = union_all(
+        select(Reservation.statut, Reservation.date_arrivee, Reservation.prix_total)
+        .where(Reservation.client_id == client_id),
+        select(ReservationArchive.statut, ReservationArchive.date_arrivee,
+               ReservationArchive.prix_total)
+        .where(ReservationArchive.client_id == client_id)
+    ).subquery()
+
+    actif = sejours.c.statut != 'annulee'
+    commence = actif & (sejours.c.date_arrivee <= aujourd_hui)
+    a_venir = actif & (sejours.c.date_arrivee > aujourd_hui)
+
+    ligne = db.session.execute(select(
+        func.count().filter(commence).label('nombre_sejours'),
+        func.coalesce(func.sum(sejours.c.prix_total).filter(commence), 0).label('depense_totale'),
+        func.max(sejours.c.date_arrivee).filter(commence).label('dernier_sejour'),
+        func.count().filter(a_venir).label('sejours_a_venir'),
+        func.min(sejours.c.date_arrivee).filter(a_venir).label('prochain_sejour'),
+        func.count().filter(sejours.c.statut == 'annulee').label('annulations')
+    )).one()
+    return ligne._asdict()
+
+
+def resume_client(client_id):
+    resume = profils.lire(client_id)
+    if resume is None:
+        resume = calculer_resume(client_id)
+        profils.ecrire(client_id, resume)
+    return resume
+
+
+def encoder_curseur(date_reservation, reservation_id):
+    date_iso = date_reservation.isoformat() if date_reservation is not None else None
+    brut = json.dumps([date_iso, reservation_id]).encode()
+    return base64.urlsafe_b64encode(brut).decode().rstrip('=')
+
+
+def decoder_curseur(curseur):
+    """(date_reservation ou None, id) d'un curseur ; ValueError s'il est invalide"""
+    try:
+        brut = base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4))
+        date_iso, reservation_id = json.loads(brut)
+        date_reservation = datetime.fromisoformat(date_iso) if date_iso is not None else None
+        reservation_id = int(reservation_id)
+    except (ValueError, TypeError, OverflowError):
+        raise ValueError('Curseur invalide')
+    # Un id hors des entiers 64 bits ferait lever OverflowError au pilote (500)
+    if not -2 ** 63 <= reservation_id < 2 ** 63:
+        raise ValueError('Curseur invalide')
+    return date_reservation, reservation_id
+
+
+def page_historique(client_id, limite, curseur=None, archive=False, options=()):
+    """Réservations du client, plus récentes d'abord ; renvoie (lignes, curseur suivant)"""
+    modele = ReservationArchive if archive else Reservation
+    base = select(modele).options(*options).where(modele.client_id == client_id)
+    date_curseur, id_curseur = decoder_curseur(curseur) if curseur else (None, None)
+
+    # Réservations datées, tant que le curseur n'a pas atteint les lignes sans date
+    lignes = []
+    if not curseur or date_curseur is not None:
+        requete = base.where(modele.date_reservation.is_not(None))
+        if curseur:
+            requete = requete.where(
+                tuple_(modele.date_reservation, modele.id) < tuple_(date_curseur, id_curseur)
+            )
+        requete = requete.order_by(modele.date_reservation.desc(), modele.id.desc())
+        lignes = db.session.scalars(requete.limit(limite + 1)).all()
+
+    # Page incomplète : suite avec les réservations sans date
+    if len(lignes) <= limite:
+        requete = base.where(modele.date_reservation.is_(None))
+        if curseur and date_curseur is None:
+            requete = requete.where(modele.id < id_curseur)
+        requete = requete.order_by(modele.id.desc()).limit(limite + 1 - len(lignes))
+        lignes += db.session.scalars(requete).all()
+
+    suivant = None
+    if len(lignes) > limite:
+        lignes = lignes[:limite]
+        suivant = encoder_curseur(lignes[-1].date_reservation, lignes[-1].id)
+    return lignes, suivant
+
+
+def _clients_modifies(session):
+    client_ids = set()
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, Reservation):
+            historique = inspect(obj).attrs.client_id.history
+            client_ids.update(i for i in historique.sum() if i is not None)
+            if obj.client_id is not None:
+                client_ids.add(obj.client_id)
+    return client_ids
+
+
+@event.listens_for(Session, 'before_flush')
+def _avant_flush(session, flush_context, instances):
+    client_ids = _clients_modifies(session)
+    if client_ids:
+        session.info.setdefault('profils_modifies', set()).update(client_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apres_commit(session):
+    client_ids = session.info.pop('profils_modifies', None)
+    if client_ids:
+        profils.invalider(client_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _apres_rollback(session, previous_transaction):
+    session.info.pop('profils_modifies', None)
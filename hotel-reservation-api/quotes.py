@@ -0,0 +1,133 @@
+"""
+Évaluation groupée de demandes de devis (prix et disponibilité).
+
+Toutes les demandes sont traitées en une passe : une requête pour les chambres
+concernées, une pour les réservations qui chevauchent la fenêtre de dates, puis
+les séjours de chaque chambre triés par arrivée : un test de chevauchement est
+une recherche dichotomique, dont le coût ne dépend ni de l'écart entre les
+dates demandées ni du nombre de jours couverts par la fenêtre.
+"""
+from bisect import bisect_left
+from itertools import accumulate
+
+from models import db, Chambre, Reservation
+from pricing import moteur
+
+
+class _Occupation:
+    """Séjours d'une chambre triés par arrivée, et départ le plus tardif de chaque préfixe"""
+    __slots__ = ('arrivees', 'departs_max')
+
+    def __init__(self, sejours):
+        sejours = sorted(sejours)
+        self.arrivees = [date_arrivee for date_arrivee, _ in sejours]
+        self.departs_max = list(accumulate((date_depart for _, date_depart in sejours), max))
+
+    def libre(self, date_arrivee, date_depart):
+        # Parmi les séjours arrivés avant date_depart, un seul départ après
+        # date_arrivee suffit à chevaucher : le plus tardif est testé
+        arrives = bisect_left(self.arrivees, date_depart)
+        return arrives == 0 or self.departs_max[arrives - 1] <= date_arrivee
+
+
+def evaluer_demandes(demandes):
+    """
+    Calcule prix et disponibilité pour une liste de demandes validées
+    par DemandeDevisSchema. Les résultats sont rendus dans l'ordre des demandes.
+    """
+    if not demandes:
+        return []
+
+    ids = {d['chambre_id'] for d in demandes if 'chambre_id' in d}
+    types = {d['type'] for d in demandes if 'type' in d}
+    origine = min(d['date_arrivee'] for d in demandes)
+    fin = max(d['date_depart'] for d in demandes)
+
+    # Une requête pour les chambres, une pour les réservations qui chevauchent
+    chambres = db.session.query(
+        Chambre.id, Chambre.type, Chambre.capacite, Chambre.disponible
+    ).filter(db.or_(Chambre.id.in_(ids), Chambre.type.in_(types))).all()
+    chambres_par_id = {c.id: c for c in chambres}
+    chambres_par_type = {}
+    for chambre in chambres:
+        chambres_par_type.setdefault(chambre.type, []).append(chambre)
+
+    sejours = {}
+    if chambres:
+        for chambre_id, date_arrivee, date_depart in db.session.query(
+                Reservation.chambre_id, Reservation.date_arrivee, Reservation.date_depart
+        ).filter(
+            Reservation.chambre_id.in_(chambres_par_id.keys()),
+            Reservation.statut != 'annulee',
+            Reservation.date_arrivee < fin,
+            Reservation.date_depart > origine
+        ):
+            sejours.setdefault(chambre_id, []).append((date_arrivee, date_depart))
+
+    occupations = {chambre_id: _Occupation(liste) for chambre_id, liste in sejours.items()}
+
+    def motif_indisponibilite(chambre, demande):
+        if not chambre.disponible:
+            return 'Chambre non disponible'
+        if chambre.capacite < demande['nombre_personnes']:
+            return 'Capacité insuffisante'
+        occupation = occupations.get(chambre.id)
+        if occupation is not None and not occupation.libre(demande['date_arrivee'],
+                                                             demande['date_depart']):
+            return 'Chambre déjà réservée sur ces dates'
+        return None
+
+    resultats = []
+    for index, demande in enumerate(demandes):
+        resultat = {
+            'index': index,
+            'chambre_id': demande.get('chambre_id'),
+            'type': demande.get('type'),
+            'date_arrivee': demande['date_arrivee'].isoformat(),
+            'date_depart': demande['date_depart'].isoformat(),
+            'nombre_personnes': demande['nombre_personnes'],
+            'nb_nuits': (demande['date_depart'] - demande['date_arrivee']).days,
+            'disponible': False,
+            'prix_total': None
+        }
+
+        if 'chambre_id' in demande:
+            chambre = chambres_par_id.get(demande['chambre_id'])
+            # Chambre supprimée entre les deux lectures : absente des tables
+            table = moteur.table(chambre.id) if chambre is not None else None
+            if table is None:
+                resultat['motif'] = 'Chambre introuvable'
+            else:
+                devis = moteur.devis_table(table, demande['date_arrivee'], demande['date_depart'])
+                motif = motif_indisponibilite(chambre, demande)
+                resultat['type'] = chambre.type
+                resultat['prix_total'] = str(devis.prix_total)
+                resultat['disponible'] = motif is None
+                if motif:
+                    resultat['motif'] = motif
+        else:
+            # Par type : la chambre libre la moins chère (même remise pour
+            # tout le type, la comparaison des sous-totaux suffit)
+            meilleur = None
+            for chambre in chambres_par_type.get(demande['type'], ()):
+                if motif_indisponibilite(chambre, demande) is not None:
+                    continue
+                table = moteur.table(chambre.id)
+                if table is None:
+                    continue
+                centimes = moteur.sous_total_centimes(table, demande['date_arrivee'],
+                                                      demande['date_depart'])
+                if meilleur is None or centimes < meilleur[0]:
+                    meilleur = (centimes, chambre.id, table)
+            if meilleur is None:
+                resultat['motif'] = 'Aucune chambre de ce type disponible'
+            else:
+                devis = moteur.devis_table(meilleur[2], demande['date_arrivee'],
+                                           demande['date_depart'])
+                resultat['chambre_id'] = meilleur[1]
+                resultat['prix_total'] = str(devis.prix_total)
+                resultat['disponible'] = True
+
+        resultats.append(resultat)
+
+    return resultats
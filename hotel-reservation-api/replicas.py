@@ -0,0 +1,179 @@
+"""
+Routage des lectures vers des réplicas de la base de données.
+
+Les requêtes GET/HEAD (et les vues marquées ``@lecture_seule``) sont servies
+par un réplica choisi en tourniquet parmi ceux qui répondent au contrôle de
+santé ; tout le reste, ainsi que les flush et les traitements hors requête
+(CLI, maintenance), utilise la base primaire. Après une écriture, un cookie
+maintient les lectures du même client sur la primaire pendant
+REPLICA_STICKY_SECONDS, le temps que la réplication rattrape son retard.
+"""
+import itertools
+import logging
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+METHODES_LECTURE = ('GET', 'HEAD', 'OPTIONS')
+METHODES_ECRITURE = ('POST', 'PUT', 'PATCH', 'DELETE')
+COOKIE_PRIMAIRE = 'db_primaire_jusqua'
+
+metriques = {
+    'lectures_replica': 0,
+    'lectures_primaire': 0,
+    'lectures_collantes': 0,
+    'ecritures': 0,
+    'replicas_indisponibles': 0
+}
+_verrou_metriques = threading.Lock()
+
+
+def _compter(cle):
+    with _verrou_metriques:
+        metriques[cle] += 1
+
+
+def lecture_seule(vue):
+    """Marque une vue non-GET comme lecture seule (routable vers un réplica)"""
+    vue.lecture_seule = True
+    return vue
+
+
+class SessionRoutee(Session):
+    """Session qui envoie les requêtes d'une lecture vers le réplica choisi"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            cle = g.get('db_replica')
+            if cle is not None:
+                return self._db.engines[cle]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class RoutageReplicas:
+    """Choix du réplica en tourniquet, avec contrôle de santé paresseux"""
+
+    def __init__(self, db, cles, intervalle_controle):
+        self.db = db
+        self.cles = cles
+        self.intervalle_controle = intervalle_controle
+        self._tourniquet = itertools.cycle(cles)
+        self._verrou = threading.Lock()
+        self._sain = {cle: True for cle in cles}
+        self._prochain_controle = {cle: 0.0 for cle in cles}
+
+    def _controler(self, cle):
+        try:
+            with self.db.engines[cle].connect() as connexion:
+                connexion.execute(text('SELECT 1'))
+            sain = True
+        except Exception as err:
+            logger.warning('Réplica %s indisponible : %s', cle, err)
+            sain = False
+        self._sain[cle] = sain
+        self._prochain_controle[cle] = time.monotonic() + self.intervalle_controle
+        return sain
+
+    def est_sain(self, cle):
+        with self._verrou:
+            controler = time.monotonic() >= self._prochain_controle[cle]
+            if controler:
+                # Un seul contrôle à la fois : les requêtes concurrentes gardent
+                # le dernier état connu jusqu'à son résultat
+                self._prochain_controle[cle] = float('inf')
+        if controler:
+            return self._controler(cle)
+        return self._sain[cle]
+
+    def choisir(self):
+        """Prochain réplica sain, ou None si aucun ne répond"""
+        for _ in range(len(self.cles)):
+            with self._verrou:
+                cle = next(self._tourniquet)
+            if self.est_sain(cle):
+                return cle
+        return None
+
+    def etat(self):
+        return {cle: self._sain[cle] for cle in self.cles}
+
+
+def options_moteur(uri, config):
+    """Options de pool d'un moteur ; la taille seulement si son dialecte utilise un QueuePool"""
+    options = {'pool_pre_ping': config['DB_POOL_PRE_PING']}
+    url = make_url(uri)
+    if issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        options['pool_size'] = config['DB_POOL_SIZE']
+        options['max_overflow'] = config['DB_MAX_OVERFLOW']
+    return options
+
+
+def configurer_binds(app):
+    """Déclare les réplicas comme binds et dimensionne les pools ; à appeler avant db.init_app"""
+    config = app.config
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **options_moteur(config['SQLALCHEMY_DATABASE_URI'], config),
+        **config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
+
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    cles = []
+    for index, uri in enumerate(config['DB_REPLICA_URIS']):
+        cle = f'replica_{index}'
+        binds[cle] = {'url': uri, **options_moteur(uri, config)}
+        cles.append(cle)
+    config['SQLALCHEMY_BINDS'] = binds
+    return cles
+
+
+def _choisir_base():
+    routage = current_app.extensions['replicas']
+    g.db_replica = None
+
+    vue = current_app.view_functions.get(request.endpoint)
+    lecture = request.method in METHODES_LECTURE or getattr(vue, 'lecture_seule', False)
+    if not lecture:
+        _compter('ecritures')
+        return
+
+    try:
+        collant = float(request.cookies.get(COOKIE_PRIMAIRE, 0)) > time.time()
+    except ValueError:
+        collant = False
+    if collant:
+        _compter('lectures_collantes')
+        return
+
+    g.db_replica = routage.choisir()
+    if g.db_replica is None:
+        _compter('replicas_indisponibles')
+        _compter('lectures_primaire')
+    else:
+        _compter('lectures_replica')
+
+
+def _marquer_ecriture(response):
+    fenetre = current_app.config['REPLICA_STICKY_SECONDS']
+    vue = current_app.view_functions.get(request.endpoint)
+    if (request.method in METHODES_ECRITURE and response.status_code < 400
+            and not getattr(vue, 'lecture_seule', False) and fenetre > 0):
+        response.set_cookie(COOKIE_PRIMAIRE, str(time.time() + fenetre),
+                            max_age=fenetre, httponly=True, samesite='Lax')
+    return response
+
+
+def init_replicas(app, db, cles):
+    """Active le routage lecture/écriture si des réplicas sont configurés"""
+    if not cles:
+        return
+    routage = RoutageReplicas(db, cles, app.config['REPLICA_HEALTH_INTERVAL'])
+    app.extensions['replicas'] = routage
+    app.before_request(_choisir_base)
+    app.after_request(_marquer_ecriture)
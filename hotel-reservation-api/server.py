@@ -0,0 +1,148 @@
+"""
+Lanceur de production : gunicorn en pré-fork (workers « gthread »).
+
+L'application est construite une seule fois dans le processus maître avec
+create_app, préchauffée (tables tarifaires, routes, sérialiseurs, cache de
+requêtes compilées SQLAlchemy) puis partagée par copie à l'écriture entre les
+workers. Les pools de connexions sont réinitialisés après le fork pour
+qu'aucune connexion ne soit partagée entre processus.
+
+    python server.py [--bind 0.0.0.0:5000] [--workers N] [--threads T]
+"""
+import argparse
+import logging
+import os
+import sys
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+URLS_PRECHAUFFAGE = (
+    '/',
+    '/api/chambres',
+    '/api/clients?per_page=1',
+    '/api/reservations?per_page=1',
+    '/api/stats',
+)
+
+
+def calculer_workers(config=Config, coeurs=None):
+    """
+    Nombre de workers et de threads par worker.
+
+    Par défaut 2 x coeurs + 1 workers, plafonné pour que l'ensemble des pools
+    tienne dans DB_MAX_CONNECTIONS, et autant de threads que de connexions
+    permanentes du pool (un thread n'attend jamais une connexion libre).
+    """
+    coeurs = coeurs or os.cpu_count() or 1
+    taille_pool = config.DB_POOL_SIZE + config.DB_MAX_OVERFLOW
+
+    workers = config.WEB_WORKERS or 2 * coeurs + 1
+    workers = max(1, min(workers, config.DB_MAX_CONNECTIONS // taille_pool))
+    threads = config.WEB_THREADS or config.DB_POOL_SIZE
+    return workers, threads
+
+
+def reinitialiser_connexions(app, fermer=True):
+    """Vide les pools de tous les moteurs (fermer=False après un fork)"""
+    from models import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=fermer)
+
+
+def prechauffer(app):
+    """Compile routes, sérialiseurs et tables de prix avant d'accepter du trafic"""
+    from pricing import moteur
+
+    with app.app_context():
+        try:
+            moteur.construire()
+        except Exception as err:
+            logger.warning('Préchauffage du moteur tarifaire impossible : %s', err)
+
+    client = app.test_client()
+    for url in URLS_PRECHAUFFAGE:
+        try:
+            reponse = client.get(url, headers={'Accept-Encoding': 'gzip'})
+            logger.info('Préchauffage %s : %s', url, reponse.status_code)
+        except Exception as err:
+            logger.warning('Préchauffage %s impossible : %s', url, err)
+
+    # Les connexions ouvertes ici ne doivent pas être héritées par les workers
+    reinitialiser_connexions(app)
+
+
+def creer_serveur(app, options):
+    from gunicorn.app.base import BaseApplication
+
+    class ServeurHotel(BaseApplication):
+        def load_config(self):
+            for cle, valeur in options.items():
+                self.cfg.set(cle, valeur)
+
+        def load(self):
+            return app
+
+    return ServeurHotel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur de production de l'API")
+    parser.add_argument('--bind', default=Config.WEB_BIND)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--threads', type=int)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(message)s')
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        sys.exit('gunicorn est requis (pip install -r requirements.txt, Linux/macOS) ; '
+                 'sous Windows, utilisez python app.py pour le développement.')
+
+    from app import create_app
+
+    workers, threads = calculer_workers()
+    workers = args.workers or workers
+    threads = args.threads or threads
+
+    app = create_app('production')
+    prechauffer(app)
+
+    def post_fork(server, worker):
+        reinitialiser_connexions(app, fermer=False)
+
+    def worker_exit(server, worker):
+        tampon = app.extensions.get('tampon_statuts')
+        if tampon is not None:
+            tampon.arreter()
+        reinitialiser_connexions(app)
+
+    def on_exit(server):
+        planificateur = app.extensions.get('maintenance')
+        if planificateur is not None:
+            planificateur.arreter()
+
+    options = {
+        'bind': args.bind,
+        'workers': workers,
+        'threads': threads,
+        'worker_class': 'gthread',
+        'preload_app': True,
+        'graceful_timeout': Config.WEB_GRACEFUL_TIMEOUT,
+        'timeout': Config.WEB_TIMEOUT,
+        'keepalive': 5,
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+        'on_exit': on_exit,
+    }
+    logger.info('Démarrage sur %s : %d workers x %d threads', args.bind, workers, threads)
+    creer_serveur(app, options).run()
+
+
+if __name__ == '__main__':
+    main()
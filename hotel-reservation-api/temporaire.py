@@ -0,0 +1,63 @@
+"""
+Application sur une base SQLite temporaire, pour les tests et les benchmarks.
+
+``application_temporaire`` règle Config (base, réplicas, maintenance...), crée
+l'application puis restaure Config, ferme les connexions et supprime le
+fichier SQLite à la sortie. Les benchmarks l'importent directement, sans
+dépendre de pytest.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+from config import Config
+
+
+@contextmanager
+def reglages_config(**reglages):
+    """Modifie des attributs de Config le temps du bloc"""
+    anciens = {cle: getattr(Config, cle) for cle in reglages}
+    for cle, valeur in reglages.items():
+        setattr(Config, cle, valeur)
+    try:
+        yield
+    finally:
+        for cle, valeur in anciens.items():
+            setattr(Config, cle, valeur)
+
+
+@contextmanager
+def application_temporaire(url=None, **reglages):
+    """Application sur url, ou sur un fichier SQLite temporaire si url est None"""
+    from app import create_app
+    from models import db
+    from pricing import moteur
+    from profiles import profils
+
+    fichier = None
+    if url is None:
+        descripteur, fichier = tempfile.mkstemp(suffix='.db')
+        os.close(descripteur)
+        url = f'sqlite:///{fichier}'
+
+    reglages = {'SQLALCHEMY_DATABASE_URI': url, 'DB_REPLICA_URIS': [],
+                'MAINTENANCE_INTERVAL': 0, **reglages}
+    try:
+        with reglages_config(**reglages):
+            # Caches globaux d'une éventuelle application précédente
+            moteur.invalider()
+            profils.invalider()
+            app = create_app('testing')
+            try:
+                yield app
+            finally:
+                for extension in ('tampon_statuts', 'maintenance'):
+                    if app.extensions.get(extension) is not None:
+                        app.extensions[extension].arreter()
+                with app.app_context():
+                    db.session.remove()
+                    for engine in db.engines.values():
+                        engine.dispose()
+    finally:
+        if fichier:
+            os.remove(fichier)
@@ -0,0 +1,24 @@
+"""
+Fixtures partagées : application sur une base temporaire (voir temporaire.py).
+"""
+import os
+import sys
+from contextlib import ExitStack
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from temporaire import application_temporaire  # noqa: E402
+
+# Script à lancer contre un serveur démarré (python tests/test_api.py), pas
+# une suite pytest : sans serveur, ses fonctions test_* passeraient quand même
+collect_ignore = ['test_api.py']
+
+
+@pytest.fixture(scope='module')
+def creer_app():
+    """Fabrique ``creer_app(url=None, **reglages)`` ; tout est restauré en fin de module"""
+    with ExitStack() as pile:
+        yield lambda url=None, **reglages: pile.enter_context(
+            application_temporaire(url, **reglages))
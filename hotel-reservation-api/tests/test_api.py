@@ -58,6 +58,20 @@ def test_get_stats():
         return False
 
 
+def test_metrics():
+    """Test des métriques internes"""
+    print(f"\n{Colors.BLUE}=== Test: Métriques ==={Colors.END}")
+    try:
+        response = requests.get(f"{BASE_URL}/api/metrics")
+        data = response.json()
+        passed = response.status_code == 200 and 'maintenance' in data['data']
+        print_test("GET /api/metrics", passed)
+        return passed
+    except Exception as e:
+        print_test("GET /api/metrics", False, str(e))
+        return False
+
+
 def test_clients():
     """Tests CRUD pour les clients"""
     print(f"\n{Colors.BLUE}=== Tests: Clients ==={Colors.END}")
@@ -92,10 +106,26 @@ def test_clients():
 
             # GET client par ID
             response = requests.get(f"{BASE_URL}/api/clients/{client_id}")
-            passed = response.status_code == 200
+            data = response.json()
+            passed = (response.status_code == 200 and
+                      data['data']['resume']['nombre_sejours'] == 0 and
+                      'reservations' not in data['data'])
             print_test(f"GET /api/clients/{client_id}", passed)
             results.append(passed)
 
+            # GET historique paginé
+            response = requests.get(f"{BASE_URL}/api/clients/{client_id}/reservations")
+            data = response.json()
+            passed = (response.status_code == 200 and data['data'] == [] and
+                      data['pagination']['next_cursor'] is None)
+            print_test(f"GET /api/clients/{client_id}/reservations", passed)
+            results.append(passed)
+
+            response = requests.get(f"{BASE_URL}/api/clients/{client_id}/reservations?cursor=abc")
+            passed = response.status_code == 400
+            print_test("Historique avec curseur invalide (attendu: 400)", passed)
+            results.append(passed)
+
             # PUT mettre à jour
             update_data = {"telephone": "+33698765432"}
             response = requests.put(f"{BASE_URL}/api/clients/{client_id}", json=update_data)
@@ -112,6 +142,30 @@ def test_clients():
         print_test("POST /api/clients", False, str(e))
         results.append(False)
 
+    # DELETE groupé
+    try:
+        ids = []
+        for i in range(2):
+            new_client = {
+                "nom": "Purge",
+                "prenom": f"Client{i}",
+                "email": f"purge.{i}.{datetime.now().timestamp()}@email.com"
+            }
+            response = requests.post(f"{BASE_URL}/api/clients", json=new_client)
+            ids.append(response.json()['data']['id'])
+
+        response = requests.delete(f"{BASE_URL}/api/clients",
+                                   params={"ids": ",".join(map(str, ids + [99999]))})
+        data = response.json()
+        passed = (response.status_code == 200 and
+                  data['data']['supprimes'] == ids and
+                  data['data']['introuvables'] == [99999])
+        print_test("DELETE /api/clients?ids=...", passed)
+        results.append(passed)
+    except Exception as e:
+        print_test("DELETE /api/clients?ids=...", False, str(e))
+        results.append(False)
+
     return all(results)
 
 
@@ -216,6 +270,90 @@ def test_reservations():
     return all(results)
 
 
+def test_tarifs():
+    """Tests du moteur tarifaire"""
+    print(f"\n{Colors.BLUE}=== Tests: Tarifs ==={Colors.END}")
+    results = []
+
+    today = datetime.now()
+    date_arrivee = (today + timedelta(days=60)).strftime('%Y-%m-%d')
+    date_depart = (today + timedelta(days=63)).strftime('%Y-%m-%d')
+
+    try:
+        response = requests.get(f"{BASE_URL}/api/tarifs")
+        passed = response.status_code == 200
+        print_test("GET /api/tarifs", passed)
+        results.append(passed)
+    except Exception as e:
+        print_test("GET /api/tarifs", False, str(e))
+        results.append(False)
+
+    try:
+        response = requests.get(f"{BASE_URL}/api/chambres/1/devis",
+                                params={"date_arrivee": date_arrivee, "date_depart": date_depart})
+        data = response.json()
+        passed = response.status_code == 200 and data['data']['nb_nuits'] == 3
+        print_test("GET /api/chambres/1/devis", passed,
+                   f"Prix total: {data['data']['prix_total']}" if passed else "")
+        results.append(passed)
+    except Exception as e:
+        print_test("GET /api/chambres/1/devis", False, str(e))
+        results.append(False)
+
+    try:
+        response = requests.get(f"{BASE_URL}/api/chambres/1/devis",
+                                params={"date_arrivee": date_depart, "date_depart": date_arrivee})
+        passed = response.status_code == 400
+        print_test("Devis avec dates inversées (attendu: 400)", passed)
+        results.append(passed)
+    except Exception as e:
+        print_test("Devis dates inversées", False, str(e))
+        results.append(False)
+
+    try:
+        tarif = {
+            "type_chambre": "Suite",
+            "date_debut": date_arrivee,
+            "date_fin": date_depart,
+            "prix_par_nuit": "300.00"
+        }
+        response = requests.post(f"{BASE_URL}/api/tarifs", json=tarif)
+        data = response.json()
+        passed = response.status_code == 201 and data['success']
+        print_test("POST /api/tarifs", passed)
+        results.append(passed)
+
+        if passed:
+            tarif_id = data['data']['id']
+            response = requests.delete(f"{BASE_URL}/api/tarifs/{tarif_id}")
+            passed = response.status_code == 200
+            print_test(f"DELETE /api/tarifs/{tarif_id}", passed)
+            results.append(passed)
+    except Exception as e:
+        print_test("POST /api/tarifs", False, str(e))
+        results.append(False)
+
+    try:
+        demandes = [
+            {"chambre_id": 1, "date_arrivee": date_arrivee, "date_depart": date_depart},
+            {"type": "Double", "date_arrivee": date_arrivee, "date_depart": date_depart,
+             "nombre_personnes": 2},
+            {"chambre_id": 99999, "date_arrivee": date_arrivee, "date_depart": date_depart}
+        ]
+        response = requests.post(f"{BASE_URL}/api/quotes", json={"demandes": demandes})
+        data = response.json()
+        passed = (response.status_code == 200 and
+                  [r['index'] for r in data['data']] == [0, 1, 2] and
+                  data['data'][2]['disponible'] is False)
+        print_test("POST /api/quotes", passed)
+        results.append(passed)
+    except Exception as e:
+        print_test("POST /api/quotes", False, str(e))
+        results.append(False)
+
+    return all(results)
+
+
 def test_filters():
     """Tests des filtres"""
     print(f"\n{Colors.BLUE}=== Tests: Filtres ==={Colors.END}")
@@ -231,6 +369,16 @@ def test_filters():
         print_test("GET /api/reservations?statut=confirmee", False, str(e))
         results.append(False)
 
+    # Réservations archivées
+    try:
+        response = requests.get(f"{BASE_URL}/api/reservations?archive=true")
+        passed = response.status_code == 200 and 'pagination' in response.json()
+        print_test("GET /api/reservations?archive=true", passed)
+        results.append(passed)
+    except Exception as e:
+        print_test("GET /api/reservations?archive=true", False, str(e))
+        results.append(False)
+
     # Réservations par client
     try:
         response = requests.get(f"{BASE_URL}/api/reservations?client_id=1")
@@ -244,6 +392,89 @@ def test_filters():
     return all(results)
 
 
+def test_multi_get():
+    """Tests de la lecture groupée par identifiants"""
+    print(f"\n{Colors.BLUE}=== Tests: Lecture groupée ==={Colors.END}")
+    results = []
+
+    try:
+        response = requests.get(f"{BASE_URL}/api/chambres?ids=2,1,99999")
+        data = response.json()
+        passed = (response.status_code == 200 and
+                  [c['id'] for c in data['data']] == [2, 1] and
+                  data['introuvables'] == [99999])
+        print_test("GET /api/chambres?ids=2,1,99999", passed)
+        results.append(passed)
+    except Exception as e:
+        print_test("GET /api/chambres?ids=...", False, str(e))
+        results.append(False)
+
+    try:
+        response = requests.get(f"{BASE_URL}/api/clients?ids=1,2&shallow=true")
+        data = response.json()
+        passed = (response.status_code == 200 and
+                  all('reservations' not in c for c in data['data']))
+        print_test("GET /api/clients?ids=1,2&shallow=true", passed)
+        results.append(passed)
+    except Exception as e:
+        print_test("GET /api/clients?ids=...", False, str(e))
+        results.append(False)
+
+    try:
+        response = requests.get(f"{BASE_URL}/api/reservations?ids=abc")
+        passed = response.status_code == 400
+        print_test("GET /api/reservations?ids=abc (attendu: 400)", passed)
+        results.append(passed)
+    except Exception as e:
+        print_test("GET /api/reservations?ids=abc", False, str(e))
+        results.append(False)
+
+    return all(results)
+
+
+def test_statuts_chambres():
+    """Tests de la mise à jour groupée des statuts de chambres"""
+    print(f"\n{Colors.BLUE}=== Tests: Statuts des chambres ==={Colors.END}")
+    results = []
+
+    try:
+        avant = requests.get(f"{BASE_URL}/api/chambres?ids=1,2").json()['data']
+        statuts = [
+            {"id": 1, "disponible": False},
+            {"id": 2, "disponible": False},
+            {"id": 1, "disponible": True},
+            {"id": 99999, "disponible": False}
+        ]
+        response = requests.patch(f"{BASE_URL}/api/chambres/status?durabilite=sync", json=statuts)
+        data = response.json()
+        passed = (response.status_code == 200 and
+                  data['data']['mises_a_jour'] == [1, 2] and
+                  data['data']['introuvables'] == [99999])
+        apres = {c['id']: c['disponible']
+                 for c in requests.get(f"{BASE_URL}/api/chambres?ids=1,2").json()['data']}
+        passed = passed and apres == {1: True, 2: False}
+        print_test("PATCH /api/chambres/status (doublons fusionnés)", passed)
+        results.append(passed)
+
+        # Remise en l'état
+        requests.patch(f"{BASE_URL}/api/chambres/status?durabilite=sync",
+                       json=[{"id": c['id'], "disponible": c['disponible']} for c in avant])
+    except Exception as e:
+        print_test("PATCH /api/chambres/status", False, str(e))
+        results.append(False)
+
+    try:
+        response = requests.patch(f"{BASE_URL}/api/chambres/status", json=[{"id": "abc"}])
+        passed = response.status_code == 400
+        print_test("PATCH /api/chambres/status invalide (attendu: 400)", passed)
+        results.append(passed)
+    except Exception as e:
+        print_test("PATCH /api/chambres/status invalide", False, str(e))
+        results.append(False)
+
+    return all(results)
+
+
 def test_pagination():
     """Tests de la pagination"""
     print(f"\n{Colors.BLUE}=== Tests: Pagination ==={Colors.END}")
@@ -298,6 +529,36 @@ def test_validation():
     return all(results)
 
 
+def test_compression():
+    """Tests de la compression des réponses"""
+    print(f"\n{Colors.BLUE}=== Tests: Compression ==={Colors.END}")
+    results = []
+
+    try:
+        response = requests.get(f"{BASE_URL}/api/chambres", headers={"Accept-Encoding": "gzip"})
+        passed = (response.status_code == 200 and
+                  'Accept-Encoding' in response.headers.get('Vary', '') and
+                  response.headers.get('Content-Encoding') in (None, 'gzip') and
+                  response.json()['success'])
+        print_test("GET /api/chambres (Accept-Encoding: gzip)", passed,
+                   f"Content-Encoding: {response.headers.get('Content-Encoding')}")
+        results.append(passed)
+    except Exception as e:
+        print_test("Compression gzip", False, str(e))
+        results.append(False)
+
+    try:
+        response = requests.get(f"{BASE_URL}/api/chambres", headers={"Accept-Encoding": "identity"})
+        passed = response.status_code == 200 and 'Content-Encoding' not in response.headers
+        print_test("GET /api/chambres (Accept-Encoding: identity)", passed)
+        results.append(passed)
+    except Exception as e:
+        print_test("Compression identity", False, str(e))
+        results.append(False)
+
+    return all(results)
+
+
 def main():
     """Fonction principale"""
     print(f"\n{Colors.YELLOW}{'=' * 60}")
@@ -317,12 +578,17 @@ def main():
     test_results = {
         "Page d'accueil": test_home(),
         "Statistiques": test_get_stats(),
+        "Métriques": test_metrics(),
         "Clients": test_clients(),
         "Chambres": test_chambres(),
         "Réservations": test_reservations(),
+        "Tarifs": test_tarifs(),
         "Filtres": test_filters(),
+        "Lecture groupée": test_multi_get(),
+        "Statuts des chambres": test_statuts_chambres(),
         "Pagination": test_pagination(),
-        "Validation": test_validation()
+        "Validation": test_validation(),
+        "Compression": test_compression()
     }
 
     # Résumé
@@ -0,0 +1,136 @@
+"""
+Compression des réponses : négociation, seuil, flux et cache
+
+    python -m pytest tests/test_compression.py
+"""
+import gzip
+
+import pytest
+from flask import Response
+
+from compression import CacheCompression, compresser_flux, negocier
+
+PREFERENCES = ['br', 'zstd', 'gzip']
+
+
+@pytest.fixture(scope='module')
+def app(creer_app):
+    from models import db, Client
+
+    application = creer_app(COMPRESS_ENABLED=True, COMPRESS_ALGORITHMS=['gzip'],
+                            COMPRESS_MIN_SIZE=500, COMPRESS_CACHE_MAX_BYTES=1024 * 1024)
+
+    @application.route('/test/flux')
+    def flux():
+        return Response((f'ligne {i}\n' for i in range(2000)), mimetype='text/plain')
+
+    with application.app_context():
+        db.session.add_all([Client(nom=f'Nom{i}', prenom='Prénom', email=f'client{i}@email.com')
+                            for i in range(40)])
+        db.session.commit()
+    return application
+
+
+@pytest.mark.parametrize('entete, attendu', [
+    ('gzip', 'gzip'),
+    ('gzip, br', 'br'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('gzip;q=0.8, zstd;q=0.8', 'zstd'),
+    ('br;q=0, gzip;q=0.1', 'gzip'),
+    ('*', 'br'),
+    ('*;q=0.5, br;q=0', 'zstd'),
+    ('gzip;q=0', None),
+    ('gzip;q=abc', None),
+    ('identity', None),
+    ('compress, deflate', None),
+    ('', None),
+    (' GZIP ; q=1 ', 'gzip'),
+])
+def test_negocier(entete, attendu):
+    assert negocier(entete, PREFERENCES) == attendu
+
+
+def test_negocier_limite_aux_preferences():
+    assert negocier('br, zstd', ['gzip']) is None
+    assert negocier('*', ['gzip']) == 'gzip'
+
+
+def test_reponse_compressee(app):
+    client = app.test_client()
+    brute = client.get('/api/clients?per_page=40')
+    compressee = client.get('/api/clients?per_page=40', headers={'Accept-Encoding': 'gzip'})
+
+    assert brute.headers.get('Content-Encoding') is None
+    assert compressee.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressee.headers['Vary']
+    assert 'Accept-Encoding' in brute.headers['Vary']
+    assert gzip.decompress(compressee.get_data()) == brute.get_data()
+    assert len(compressee.get_data()) < len(brute.get_data())
+
+
+def test_seuil_de_taille(app):
+    client = app.test_client()
+    petite = client.get('/api/clients?per_page=1', headers={'Accept-Encoding': 'gzip'})
+
+    assert len(petite.get_data()) < app.config['COMPRESS_MIN_SIZE']
+    assert petite.headers.get('Content-Encoding') is None
+    assert 'Accept-Encoding' in petite.headers['Vary']
+
+
+def test_encodage_refuse(app):
+    reponse = app.test_client().get('/api/clients?per_page=40',
+                                    headers={'Accept-Encoding': 'gzip;q=0, br'})
+    assert reponse.headers.get('Content-Encoding') is None
+
+
+def test_flux_compresse(app):
+    reponse = app.test_client().get('/test/flux', headers={'Accept-Encoding': 'gzip'})
+
+    assert reponse.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in reponse.headers
+    attendu = ''.join(f'ligne {i}\n' for i in range(2000)).encode()
+    assert gzip.decompress(reponse.get_data()) == attendu
+
+
+def test_compresser_flux_aller_retour():
+    morceaux = ['début ', b'octets ', 'é' * 1000, '']
+    compresse = b''.join(compresser_flux(iter(morceaux), 'gzip', 6))
+    assert gzip.decompress(compresse) == 'début octets '.encode() + 'é'.encode() * 1000
+
+    with pytest.raises(ValueError):
+        list(compresser_flux(iter(['x']), 'lzma', 6))
+
+
+def test_cache_sur_get_repete(app):
+    cache = app.extensions['compression']
+    client = app.test_client()
+    url = '/api/clients?per_page=30'
+
+    hits, misses = cache.hits, cache.misses
+    premiere = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    seconde = client.get(url, headers={'Accept-Encoding': 'gzip'})
+
+    assert (cache.hits - hits, cache.misses - misses) == (1, 1)
+    assert seconde.get_data() == premiere.get_data()
+
+
+def test_cache_lru_borne():
+    cache = CacheCompression(taille_max=10)
+    cache.set('a', b'aaaa')
+    cache.set('b', b'bbbb')
+    assert cache.get('a') == b'aaaa'  # 'a' devient la plus récente
+
+    cache.set('c', b'cccc')
+    assert cache.get('b') is None
+    assert cache.get('a') == b'aaaa'
+    assert cache.get('c') == b'cccc'
+    assert cache.taille == 8
+
+    # Remplacement d'une entrée : la taille est recalculée
+    cache.set('a', b'aa')
+    assert cache.taille == 6
+
+    # Valeur plus grande que le cache entier : ignorée
+    cache.set('d', b'd' * 11)
+    assert cache.get('d') is None
+    assert cache.taille == 6
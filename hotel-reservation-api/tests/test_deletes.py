@@ -0,0 +1,174 @@
+"""
+Suppressions ensemblistes : clients (unitaire et par lot) et chambres
+
+    python -m pytest tests/test_deletes.py
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, insert, select
+
+
+@pytest.fixture
+def app(creer_app):
+    from models import db, Chambre, Client
+
+    application = creer_app(BULK_MAX_IDS=5)
+    with application.app_context():
+        db.session.add_all([Chambre(numero=str(100 + i), type='Simple', prix_par_nuit=80,
+                                    capacite=2) for i in range(3)])
+        db.session.add_all([Client(nom=f'Nom{i}', prenom='Prénom', email=f'client{i}@email.com')
+                            for i in range(6)])
+        db.session.commit()
+    return application
+
+
+def reserver(app, client_id, nombre, chambre_id=1, archives=0):
+    """nombre réservations et archives réservations archivées pour client_id"""
+    from models import db, Reservation, ReservationArchive
+
+    sejours = [
+        {'client_id': client_id, 'chambre_id': chambre_id,
+         'date_arrivee': date(2025, 1, 1) + timedelta(days=i),
+         'date_depart': date(2025, 1, 2) + timedelta(days=i),
+         'nombre_personnes': 1, 'prix_total': 80, 'statut': 'confirmee'}
+        for i in range(nombre + archives)
+    ]
+    with app.app_context():
+        if nombre:
+            db.session.execute(insert(Reservation), sejours[:nombre])
+        if archives:
+            premier = 100000 * client_id + 1000 * chambre_id
+            db.session.execute(insert(ReservationArchive), [
+                dict(sejour, id=premier + i, statut='terminee', date_archivage=datetime(2025, 6, 1))
+                for i, sejour in enumerate(sejours[nombre:])
+            ])
+        db.session.commit()
+
+
+def compter(app, modele, *criteres):
+    from models import db
+
+    with app.app_context():
+        return db.session.scalar(select(func.count()).select_from(modele).where(*criteres))
+
+
+def requetes_de(app, appel):
+    """Nombre d'instructions SQL exécutées pendant appel()"""
+    from models import db
+
+    requetes = []
+
+    def noter(*args):
+        requetes.append(1)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', noter)
+    try:
+        reponse = appel()
+    finally:
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', noter)
+    return reponse, len(requetes)
+
+
+def test_supprimer_client_et_historique(app):
+    from models import Client, Reservation, ReservationArchive
+
+    reserver(app, 1, 40, archives=15)
+    reserver(app, 2, 3, archives=2)
+
+    reponse = app.test_client().delete('/api/clients/1')
+    assert reponse.status_code == 200
+    assert compter(app, Client, Client.id == 1) == 0
+    assert compter(app, Reservation, Reservation.client_id == 1) == 0
+    assert compter(app, ReservationArchive, ReservationArchive.client_id == 1) == 0
+    # Les autres clients ne sont pas touchés
+    assert compter(app, Reservation, Reservation.client_id == 2) == 3
+    assert compter(app, ReservationArchive, ReservationArchive.client_id == 2) == 2
+
+    assert app.test_client().delete('/api/clients/1').status_code == 404
+
+
+def test_nombre_de_requetes_independant_de_l_historique(app):
+    reserver(app, 1, 2, archives=1)
+    reserver(app, 2, 500, archives=300)
+    client = app.test_client()
+
+    petit, requetes_petit = requetes_de(app, lambda: client.delete('/api/clients/1'))
+    grand, requetes_grand = requetes_de(app, lambda: client.delete('/api/clients/2'))
+    assert petit.status_code == grand.status_code == 200
+    assert requetes_petit == requetes_grand <= 4
+
+    reserver(app, 3, 1)
+    reserver(app, 4, 400, archives=100)
+    reserver(app, 5, 300)
+    lot_petit, requetes_lot_petit = requetes_de(app, lambda: client.delete('/api/clients?ids=3'))
+    lot_grand, requetes_lot_grand = requetes_de(app, lambda: client.delete('/api/clients?ids=4,5'))
+    assert lot_petit.status_code == lot_grand.status_code == 200
+    assert requetes_lot_petit == requetes_lot_grand <= 5
+
+
+def test_supprimer_clients_par_lot(app):
+    from models import Client, Reservation
+
+    reserver(app, 2, 10, archives=3)
+    reserver(app, 4, 5)
+    client = app.test_client()
+
+    reponse = client.delete('/api/clients?ids=4,99,2,4,77')
+    assert reponse.status_code == 200
+    assert reponse.get_json()['data'] == {'supprimes': [4, 2], 'introuvables': [99, 77]}
+    assert compter(app, Client) == 4
+    assert compter(app, Reservation) == 0
+
+    # Aucun identifiant connu : rien à supprimer, pas d'erreur
+    reponse = client.delete('/api/clients?ids=4,2')
+    assert reponse.status_code == 200
+    assert reponse.get_json()['data'] == {'supprimes': [], 'introuvables': [4, 2]}
+
+
+@pytest.mark.parametrize('requete', [
+    '/api/clients',
+    '/api/clients?ids=',
+    '/api/clients?ids=1,abc',
+    '/api/clients?ids=1,2,3,4,5,6',
+])
+def test_supprimer_clients_par_lot_invalide(app, requete):
+    from models import Client
+
+    reponse = app.test_client().delete(requete)
+    assert reponse.status_code == 400
+    assert reponse.get_json()['success'] is False
+    assert compter(app, Client) == 6
+
+
+def test_supprimer_chambre(app):
+    from models import Chambre, Reservation
+    from pricing import moteur
+
+    reserver(app, 1, 20, chambre_id=2)
+    reserver(app, 1, 4, chambre_id=3)
+    client = app.test_client()
+
+    # Tables de prix compilées, la chambre 2 comprise
+    devis = client.get('/api/chambres/2/devis?date_arrivee=2030-01-01&date_depart=2030-01-03')
+    assert devis.status_code == 200
+    with app.app_context():
+        assert moteur.table(2) is not None
+
+    reponse = client.delete('/api/chambres/2')
+    assert reponse.status_code == 200
+    assert compter(app, Chambre, Chambre.id == 2) == 0
+    assert compter(app, Reservation, Reservation.chambre_id == 2) == 0
+    assert compter(app, Reservation, Reservation.chambre_id == 3) == 4
+
+    # Cache invalidé : la chambre supprimée n'a plus de table de prix
+    assert moteur._tables is None
+    with app.app_context():
+        assert moteur.table(2) is None
+        assert moteur.table(3) is not None
+
+    assert client.delete('/api/chambres/2').status_code == 404
+    assert client.get('/api/chambres/2/devis?date_arrivee=2030-01-01'
+                      '&date_depart=2030-01-03').status_code == 404
@@ -0,0 +1,63 @@
+"""
+Mise à niveau des index d'une base créée avec l'ancien schema.sql
+
+    python -m pytest tests/test_indexes.py
+"""
+from sqlalchemy import inspect, text
+
+# Définitions de l'ancien data/schema.sql, sous les noms actuels
+ANCIENS_INDEX = [
+    'CREATE INDEX idx_reservations_client ON reservations(client_id)',
+    'CREATE INDEX idx_reservations_chambre ON reservations(chambre_id)',
+    'CREATE INDEX idx_staging_traite ON reservations_staging(traite)',
+]
+
+
+def _index(table):
+    from models import db
+    return {info['name']: info for info in inspect(db.engine).get_indexes(table)}
+
+
+def test_mise_a_niveau_ancienne_base(creer_app):
+    from indexes import mettre_a_niveau_index
+    from models import db
+
+    app = creer_app()
+    with app.app_context():
+        with db.engine.begin() as connexion:
+            for nom in ('idx_reservations_client', 'idx_reservations_chambre',
+                        'idx_staging_traite', 'idx_reservations_statut_depart'):
+                connexion.execute(text(f'DROP INDEX {nom}'))
+            for sql in ANCIENS_INDEX:
+                connexion.execute(text(sql))
+
+        crees, recrees = mettre_a_niveau_index()
+        assert crees == ['idx_reservations_statut_depart']
+        assert sorted(recrees) == ['idx_reservations_chambre', 'idx_reservations_client',
+                                   'idx_staging_traite']
+
+        reservations = _index('reservations')
+        assert reservations['idx_reservations_client']['column_names'] == ['client_id',
+                                                                           'date_reservation']
+        assert reservations['idx_reservations_chambre']['column_names'] == ['chambre_id',
+                                                                            'date_arrivee']
+        staging = _index('reservations_staging')['idx_staging_traite']
+        assert staging['column_names'] == ['id']
+        assert 'sqlite_where' in staging['dialect_options']
+
+        assert mettre_a_niveau_index() == ([], [])
+
+
+def test_base_a_jour(creer_app):
+    from indexes import mettre_a_niveau_index
+
+    app = creer_app()
+    with app.app_context():
+        assert mettre_a_niveau_index() == ([], [])
+
+
+def test_commande_creer_index(creer_app):
+    app = creer_app()
+    resultat = app.test_cli_runner().invoke(args=['creer-index'])
+    assert resultat.exit_code == 0
+    assert 'Index à jour' in resultat.output
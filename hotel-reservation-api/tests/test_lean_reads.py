@@ -0,0 +1,82 @@
+"""
+Équivalence des lectures légères (LEAN_READS) et du chemin ORM
+
+Chaque route de liste doit produire exactement le même JSON dans les deux
+modes, pagination comprise.
+
+    python -m pytest tests/test_lean_reads.py
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+URLS = [
+    '/api/clients',
+    '/api/clients?page=2&per_page=7',
+    '/api/clients?page=0&per_page=0',
+    '/api/clients?page=99',
+    '/api/chambres',
+    '/api/chambres?type=Suite',
+    '/api/chambres?disponible=false',
+    '/api/chambres?type=Double&disponible=true',
+    '/api/reservations',
+    '/api/reservations?per_page=50&page=3',
+    '/api/reservations?statut=annulee&per_page=20',
+    '/api/reservations?client_id=4',
+    '/api/reservations?client_id=4&statut=confirmee',
+    '/api/reservations?archive=true',
+    '/api/reservations?archive=true&client_id=2&per_page=3',
+]
+
+
+@pytest.fixture(scope='module')
+def app(creer_app):
+    from models import db, Chambre, Client, Reservation, ReservationArchive
+
+    application = creer_app()
+    with application.app_context():
+        types = ['Simple', 'Double', 'Suite']
+        statuts = ['confirmee', 'annulee', 'terminee']
+        creation = datetime(2024, 1, 1, 9, 30)
+        db.session.execute(insert(Chambre), [
+            {'numero': str(100 + i), 'type': types[i % 3], 'prix_par_nuit': f'{80 + i}.50',
+             'capacite': 1 + i % 4, 'disponible': i % 4 != 0}
+            for i in range(12)
+        ])
+        db.session.execute(insert(Client), [
+            {'nom': f'Nom{i}', 'prenom': 'Prénom', 'email': f'client{i}@email.com',
+             'telephone': None if i % 3 else f'+3361234{i:04d}',
+             'date_creation': creation + timedelta(days=i)}
+            for i in range(30)
+        ])
+        # Dates de réservation en partie identiques : l'ordre doit rester stable
+        sejours = [
+            {'client_id': 1 + i % 25, 'chambre_id': 1 + i % 12,
+             'date_arrivee': date(2025, 1, 1) + timedelta(days=i % 90),
+             'date_depart': date(2025, 1, 3) + timedelta(days=i % 90),
+             'nombre_personnes': 1 + i % 2, 'prix_total': f'{150 + i}.25',
+             'statut': statuts[i % 3], 'date_reservation': creation + timedelta(hours=i // 4)}
+            for i in range(400)
+        ]
+        db.session.execute(insert(Reservation), sejours)
+        db.session.execute(insert(ReservationArchive), [
+            dict(sejour, id=10000 + i, date_archivage=creation) for i, sejour in enumerate(sejours[:20])
+        ])
+        db.session.commit()
+
+    return application
+
+
+@pytest.mark.parametrize('url', URLS)
+def test_meme_json(app, url):
+    client = app.test_client()
+
+    app.config['LEAN_READS'] = False
+    orm = client.get(url)
+    app.config['LEAN_READS'] = True
+    leger = client.get(url)
+
+    assert orm.status_code == leger.status_code == 200
+    assert leger.get_data() == orm.get_data()
+    assert leger.get_json()['data'] or 'page=99' in url
@@ -0,0 +1,138 @@
+"""
+Maintenance des réservations : séjours terminés et archivage par lots
+
+    python -m pytest tests/test_maintenance.py
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, select
+
+AUJOURD_HUI = date(2025, 6, 1)
+
+
+@pytest.fixture
+def app(creer_app):
+    from models import db, Chambre, Client, Reservation
+
+    application = creer_app()
+    with application.app_context():
+        db.session.add(Chambre(numero='101', type='Simple', prix_par_nuit=80, capacite=2))
+        db.session.add(Client(nom='Dupont', prenom='Jean', email='jean.dupont@email.com'))
+        db.session.flush()
+
+        def sejours(nombre, statut, depart, premier_id):
+            return [
+                {'id': premier_id + i, 'client_id': 1, 'chambre_id': 1,
+                 'date_arrivee': depart - timedelta(days=2 + i % 3), 'date_depart': depart,
+                 'nombre_personnes': 1 + i % 2, 'prix_total': Decimal(f'{150 + i}.50'),
+                 'statut': statut, 'date_reservation': datetime(2024, 1, 1, 9) + timedelta(hours=i)}
+                for i in range(nombre)
+            ]
+
+        db.session.execute(insert(Reservation), (
+            # Séjours passés encore confirmés
+            sejours(23, 'confirmee', AUJOURD_HUI - timedelta(days=3), 1)
+            # Départ aujourd'hui ou à venir
+            + sejours(4, 'confirmee', AUJOURD_HUI, 100)
+            + sejours(4, 'confirmee', AUJOURD_HUI + timedelta(days=10), 200)
+            # Clos depuis plus d'un an (archivables), dont des confirmés anciens
+            + sejours(12, 'terminee', AUJOURD_HUI - timedelta(days=400), 300)
+            + sejours(5, 'annulee', AUJOURD_HUI - timedelta(days=500), 400)
+            + sejours(3, 'confirmee', AUJOURD_HUI - timedelta(days=450), 500)
+            # Clos récemment
+            + sejours(6, 'terminee', AUJOURD_HUI - timedelta(days=30), 600)
+            + sejours(2, 'annulee', AUJOURD_HUI - timedelta(days=364), 700)
+        ))
+        db.session.commit()
+    return application
+
+
+def statuts(db, Reservation):
+    return dict(db.session.execute(select(Reservation.id, Reservation.statut)).all())
+
+
+def test_terminer_sejours_par_lots(app):
+    from maintenance import metriques, terminer_sejours
+    from models import db, Reservation
+
+    avant_metriques = dict(metriques)
+    lots = []
+    with app.app_context():
+        avant = statuts(db, Reservation)
+        total = terminer_sejours(taille_lot=5, aujourd_hui=AUJOURD_HUI,
+                                 progression=lambda etape, lot, cumul: lots.append((lot, cumul)))
+        apres = statuts(db, Reservation)
+
+    assert total == 26
+    assert lots == [(5, 5), (5, 10), (5, 15), (5, 20), (5, 25), (1, 26)]
+    changes = {i for i in avant if avant[i] != apres[i]}
+    assert changes == set(range(1, 24)) | {500, 501, 502}
+    assert all(apres[i] == 'terminee' for i in changes)
+    # Départ aujourd'hui ou à venir : inchangés
+    assert all(apres[i] == 'confirmee' for i in list(range(100, 104)) + list(range(200, 204)))
+    assert metriques['sejours_termines'] - avant_metriques['sejours_termines'] == 26
+    assert metriques['lots'] - avant_metriques['lots'] == 6
+
+    with app.app_context():
+        assert terminer_sejours(taille_lot=5, aujourd_hui=AUJOURD_HUI) == 0
+
+
+def test_archiver_reservations_par_lots(app):
+    from maintenance import archiver_reservations, metriques
+    from models import db, Reservation, ReservationArchive
+
+    colonnes = ['id', 'client_id', 'chambre_id', 'date_arrivee', 'date_depart',
+                'nombre_personnes', 'prix_total', 'statut', 'date_reservation']
+    avant_metriques = dict(metriques)
+    with app.app_context():
+        lignes = {ligne.id: ligne for ligne in db.session.execute(
+            select(*[getattr(Reservation, c) for c in colonnes])).all()}
+        total = archiver_reservations(horizon_jours=365, taille_lot=4, aujourd_hui=AUJOURD_HUI)
+        restantes = set(db.session.scalars(select(Reservation.id)))
+        archivees = {ligne.id: ligne for ligne in db.session.execute(
+            select(*[getattr(ReservationArchive, c) for c in colonnes])).all()}
+        dates_archivage = set(db.session.scalars(select(ReservationArchive.date_archivage)))
+
+    attendues = set(range(300, 312)) | set(range(400, 405))
+    assert total == 17
+    assert set(archivees) == attendues
+    assert restantes == set(lignes) - attendues
+    # Identifiants et colonnes conservés à l'identique
+    for id_ in attendues:
+        assert tuple(archivees[id_]) == tuple(lignes[id_])
+    assert None not in dates_archivage
+    # Confirmés anciens, clos récents et séjours à venir restent en place
+    assert {500, 501, 502, 600, 700, 701, 200} <= restantes
+    assert metriques['reservations_archivees'] - avant_metriques['reservations_archivees'] == 17
+    assert metriques['lots'] - avant_metriques['lots'] == 5
+
+
+def test_executer_maintenance(app):
+    from maintenance import STATUTS_ARCHIVABLES, executer_maintenance, metriques
+    from models import db, Reservation, ReservationArchive
+
+    aujourd_hui = date.today()
+    limite = aujourd_hui - timedelta(days=app.config['ARCHIVE_HORIZON_DAYS'])
+
+    def compter(modele, *criteres):
+        return db.session.scalar(select(db.func.count()).select_from(modele).where(*criteres))
+
+    executions = metriques['executions']
+    with app.app_context():
+        a_terminer = compter(Reservation, Reservation.statut == 'confirmee',
+                             Reservation.date_depart < aujourd_hui)
+        resultat = executer_maintenance(dict(app.config, MAINTENANCE_BATCH_SIZE=7,
+                                             MAINTENANCE_BATCH_PAUSE=0))
+        restant_a_terminer = compter(Reservation, Reservation.statut == 'confirmee',
+                                     Reservation.date_depart < aujourd_hui)
+        restant_a_archiver = compter(Reservation, Reservation.statut.in_(STATUTS_ARCHIVABLES),
+                                     Reservation.date_depart < limite)
+        archivees = compter(ReservationArchive)
+
+    assert resultat['sejours_termines'] == a_terminer
+    assert resultat['reservations_archivees'] == archivees
+    assert restant_a_terminer == restant_a_archiver == 0
+    assert metriques['executions'] == executions + 1
+    assert metriques['derniere_erreur'] is None
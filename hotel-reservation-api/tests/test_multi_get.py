@@ -0,0 +1,112 @@
+"""
+Lecture groupée par identifiants (?ids=1,2,3) : ordre, doublons, introuvables
+
+    python -m pytest tests/test_multi_get.py
+"""
+from datetime import date
+
+import pytest
+
+from app import parse_ids
+
+
+@pytest.fixture(scope='module')
+def app(creer_app):
+    from models import db, Chambre, Client, Reservation
+
+    application = creer_app(MULTI_GET_MAX_IDS=5, BULK_MAX_IDS=5)
+    with application.app_context():
+        db.session.add_all([Chambre(numero=str(100 + i), type='Simple', prix_par_nuit=80,
+                                    capacite=2) for i in range(3)])
+        db.session.add_all([Client(nom=f'Nom{i}', prenom='Prénom', email=f'client{i}@email.com')
+                            for i in range(4)])
+        db.session.flush()
+        db.session.add_all([
+            Reservation(client_id=client_id, chambre_id=chambre_id,
+                        date_arrivee=date(2025, 1, jour), date_depart=date(2025, 1, jour + 2),
+                        nombre_personnes=1, prix_total=160, statut='confirmee')
+            for jour, (client_id, chambre_id) in enumerate([(1, 1), (2, 3), (2, 2)], start=1)
+        ])
+        db.session.commit()
+    return application
+
+
+def test_parse_ids():
+    assert parse_ids('3,1,2', 10) == [3, 1, 2]
+    assert parse_ids(' 2, 2,1,,2 ', 10) == [2, 1]
+    # Doublons ignorés avant le contrôle du maximum
+    assert parse_ids('1,1,1,1', 1) == [1]
+    assert parse_ids(str(2 ** 63 - 1), 10) == [2 ** 63 - 1]
+
+
+@pytest.mark.parametrize('valeur, message', [
+    ('', 'vide'),
+    (',,', 'vide'),
+    ('1,abc', 'entiers'),
+    ('1.5', 'entiers'),
+    (str(2 ** 63), 'entiers'),
+    ('999999999999999999999999999999', 'entiers'),
+    (str(-2 ** 63 - 1), 'entiers'),
+    ('1,2,3', 'Au plus 2'),
+])
+def test_parse_ids_invalide(valeur, message):
+    with pytest.raises(ValueError, match=message):
+        parse_ids(valeur, 2)
+
+
+@pytest.mark.parametrize('url, attendus, introuvables', [
+    ('/api/clients?ids=3,1,2', [3, 1, 2], []),
+    ('/api/clients?ids=2,99,2,1,2', [2, 1], [99]),
+    ('/api/chambres?ids=3,7,1', [3, 1], [7]),
+    ('/api/reservations?ids=3,1', [3, 1], []),
+    ('/api/reservations?ids=50,60', [], [50, 60]),
+])
+def test_ordre_et_introuvables(app, url, attendus, introuvables):
+    reponse = app.test_client().get(url)
+    assert reponse.status_code == 200
+    corps = reponse.get_json()
+    assert [objet['id'] for objet in corps['data']] == attendus
+    assert corps['introuvables'] == introuvables
+    assert 'pagination' not in corps
+
+
+def test_shallow(app):
+    client = app.test_client()
+
+    complets = client.get('/api/clients?ids=2,1').get_json()['data']
+    assert [len(c['reservations']) for c in complets] == [2, 1]
+    assert complets[0]['reservations'][0]['chambre']['numero'] == '102'
+    reservations = client.get('/api/reservations?ids=2').get_json()['data']
+    assert reservations[0]['client']['id'] == 2 and reservations[0]['chambre']['id'] == 3
+
+    simples = client.get('/api/clients?ids=2,1&shallow=true').get_json()['data']
+    assert [c['id'] for c in simples] == [2, 1]
+    assert all('reservations' not in c for c in simples)
+    reservations = client.get('/api/reservations?ids=2&shallow=true').get_json()['data']
+    assert 'client' not in reservations[0] and 'chambre' not in reservations[0]
+    assert (reservations[0]['client_id'], reservations[0]['chambre_id']) == (2, 3)
+
+
+@pytest.mark.parametrize('requete', [
+    '/api/clients?ids=',
+    '/api/clients?ids=1,x',
+    '/api/clients?ids=1,2,3,4,5,6',
+    '/api/chambres?ids=1,2,3,4,5,6',
+    '/api/reservations?ids=1,2,3,4,5,6',
+    '/api/clients?ids=999999999999999999999999999999',
+    '/api/reservations?ids=1,-999999999999999999999999999999',
+])
+def test_requete_invalide(app, requete):
+    reponse = app.test_client().get(requete)
+    assert reponse.status_code == 400
+    assert reponse.get_json()['success'] is False
+
+
+def test_suppression_identifiant_trop_grand(app):
+    from models import db, Client
+
+    reponse = app.test_client().delete('/api/clients?ids=1,999999999999999999999999999999')
+    assert reponse.status_code == 400
+    assert 'entiers' in reponse.get_json()['message']
+    with app.app_context():
+        assert db.session.get(Client, 1) is not None
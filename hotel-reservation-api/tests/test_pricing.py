@@ -0,0 +1,178 @@
+"""
+Moteur tarifaire : tables précompilées, calcul direct et invalidation
+
+    python -m pytest tests/test_pricing.py
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+
+# Premier lundi à au moins une semaine d'aujourd'hui (dans l'horizon)
+LUNDI = date.today() + timedelta(days=7 + (7 - date.today().weekday()) % 7)
+
+
+@pytest.fixture
+def app(creer_app):
+    from models import db, Chambre, Client
+
+    application = creer_app()
+    with application.app_context():
+        db.session.add_all([
+            Chambre(numero='101', type='Simple', prix_par_nuit=Decimal('100.00'), capacite=1),
+            Chambre(numero='201', type='Double', prix_par_nuit=Decimal('33.33'), capacite=2),
+            Chambre(numero='301', type='Suite', prix_par_nuit=Decimal('5.00'), capacite=4),
+            Client(nom='Dupont', prenom='Jean', email='jean.dupont@email.com'),
+        ])
+        db.session.commit()
+    return application
+
+
+def devis(client, chambre_id, arrivee, nuits):
+    reponse = client.get(f'/api/chambres/{chambre_id}/devis', query_string={
+        'date_arrivee': arrivee.isoformat(),
+        'date_depart': (arrivee + timedelta(days=nuits)).isoformat(),
+    })
+    assert reponse.status_code == 200, reponse.get_json()
+    return reponse.get_json()['data']
+
+
+def ajouter_tarif(client, **tarif):
+    reponse = client.post('/api/tarifs', json={
+        'type_chambre': 'Simple', 'date_debut': LUNDI.isoformat(),
+        'date_fin': (LUNDI + timedelta(days=13)).isoformat(), **tarif
+    })
+    assert reponse.status_code == 201, reponse.get_json()
+    return reponse.get_json()['data']['id']
+
+
+def test_jours_de_semaine(app):
+    client = app.test_client()
+    # Vendredi et samedi à 150
+    ajouter_tarif(client, prix_par_nuit='150.00', jours_semaine='45')
+
+    semaine = devis(client, 1, LUNDI, 7)
+    assert semaine['sous_total'] == '800.00'
+    assert devis(client, 1, LUNDI + timedelta(days=4), 1)['sous_total'] == '150.00'
+    assert devis(client, 1, LUNDI + timedelta(days=6), 1)['sous_total'] == '100.00'
+
+
+def test_priorite(app):
+    client = app.test_client()
+    # Le tarif de priorité la plus haute l'emporte, quel que soit l'ordre de création
+    ajouter_tarif(client, prix_par_nuit='200.00', priorite=5)
+    ajouter_tarif(client, prix_par_nuit='120.00', priorite=1)
+    ajouter_tarif(client, prix_par_nuit='90.00', priorite=9,
+                  date_fin=(LUNDI + timedelta(days=1)).isoformat())
+
+    assert devis(client, 1, LUNDI, 4)['sous_total'] == '580.00'
+
+
+def test_hors_horizon_identique_aux_tables(app):
+    from models import db, Chambre
+    from pricing import moteur
+
+    client = app.test_client()
+    ajouter_tarif(client, prix_par_nuit='150.00', jours_semaine='45')
+    ajouter_tarif(client, prix_par_nuit='70.00', priorite=2, date_fin=LUNDI.isoformat())
+    client.post('/api/remises', json={'nuits_min': 7, 'pourcentage': '10'})
+
+    with app.app_context():
+        depart = LUNDI + timedelta(days=16)
+        dans_horizon = moteur.devis(1, LUNDI - timedelta(days=2), depart)
+
+        moteur.horizon_jours = 3
+        try:
+            moteur.invalider()
+            hors_horizon = moteur.devis(1, LUNDI - timedelta(days=2), depart)
+        finally:
+            moteur.horizon_jours = app.config['PRICING_HORIZON_DAYS']
+            moteur.invalider()
+
+        exact = moteur.devis_exact(db.session.get(Chambre, 1), LUNDI - timedelta(days=2), depart)
+
+    assert hors_horizon == dans_horizon == exact
+    assert dans_horizon.remise_pourcentage == Decimal('10.00')
+
+
+@pytest.mark.parametrize('chambre_id, nuits, pourcentage, sous_total, prix_total', [
+    # 9999 centimes à 12,50 % : remise de 1249,875 centimes, arrondie à 1250
+    (2, 3, '12.50', '99.99', '87.49'),
+    # 1000 centimes à 0,05 % : remise d'un demi-centime, arrondie au centime supérieur
+    (3, 2, '0.05', '10.00', '9.99'),
+    # 1500 centimes à 0,03 % : 0,45 centime, arrondi à 0
+    (3, 3, '0.03', '15.00', '15.00'),
+])
+def test_arrondi_remise(app, chambre_id, nuits, pourcentage, sous_total, prix_total):
+    client = app.test_client()
+    reponse = client.post('/api/remises', json={'nuits_min': nuits, 'pourcentage': pourcentage})
+    assert reponse.status_code == 201
+
+    resultat = devis(client, chambre_id, LUNDI, nuits)
+    assert (resultat['sous_total'], resultat['prix_total']) == (sous_total, prix_total)
+
+
+def test_invalidation_apres_creation_et_suppression(app):
+    client = app.test_client()
+    assert devis(client, 1, LUNDI, 2)['prix_total'] == '200.00'
+
+    tarif_id = ajouter_tarif(client, prix_par_nuit='130.00')
+    assert devis(client, 1, LUNDI, 2)['prix_total'] == '260.00'
+
+    assert client.delete(f'/api/tarifs/{tarif_id}').status_code == 200
+    assert devis(client, 1, LUNDI, 2)['prix_total'] == '200.00'
+
+
+def test_sejour_trop_long(app):
+    client = app.test_client()
+    nuits = app.config['PRICING_MAX_NIGHTS']
+    assert devis(client, 1, LUNDI, nuits)['nb_nuits'] == nuits
+
+    reponse = client.get('/api/chambres/1/devis', query_string={
+        'date_arrivee': LUNDI.isoformat(),
+        'date_depart': (LUNDI + timedelta(days=nuits + 1)).isoformat(),
+    })
+    assert reponse.status_code == 400
+
+
+def test_reservation_au_tarif_d_un_autre_processus(app):
+    from models import db, Tarif
+
+    client = app.test_client()
+    assert devis(client, 1, LUNDI, 2)['prix_total'] == '200.00'
+
+    # Tarif écrit hors de la session de ce processus : le cache n'est pas invalidé
+    with app.app_context(), db.engine.begin() as connexion:
+        connexion.execute(insert(Tarif), {
+            'type_chambre': 'Simple', 'date_debut': LUNDI, 'date_fin': LUNDI + timedelta(days=1),
+            'prix_par_nuit': Decimal('140.00'), 'priorite': 0
+        })
+    assert devis(client, 1, LUNDI, 2)['prix_total'] == '200.00'
+
+    reponse = client.post('/api/reservations', json={
+        'client_id': 1, 'chambre_id': 1, 'nombre_personnes': 1,
+        'date_arrivee': LUNDI.isoformat(), 'date_depart': (LUNDI + timedelta(days=2)).isoformat(),
+    })
+    assert reponse.status_code == 201
+    assert reponse.get_json()['data']['prix_total'] == '280.00'
+    reservation_id = reponse.get_json()['data']['id']
+
+    reponse = client.put(f'/api/reservations/{reservation_id}', json={
+        'date_depart': (LUNDI + timedelta(days=3)).isoformat()
+    })
+    assert reponse.status_code == 200
+    assert reponse.get_json()['data']['prix_total'] == '380.00'
+
+
+def test_devis_chambre_absente_des_tables(app, monkeypatch):
+    from pricing import moteur
+
+    # Chambre supprimée entre get_or_404 et la lecture des tables
+    monkeypatch.setattr(moteur, 'table', lambda chambre_id: None)
+    reponse = app.test_client().get('/api/chambres/1/devis', query_string={
+        'date_arrivee': LUNDI.isoformat(),
+        'date_depart': (LUNDI + timedelta(days=2)).isoformat(),
+    })
+    assert reponse.status_code == 404
+    assert reponse.get_json() == {'success': False, 'message': 'Chambre introuvable'}
@@ -0,0 +1,228 @@
+"""
+Profil client : résumé des séjours (et son cache), historique paginé par curseur
+stable, y compris sans date_reservation
+
+    python -m pytest tests/test_profiles.py
+"""
+import base64
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, update
+
+
+@pytest.fixture(scope='module')
+def app(creer_app):
+    from models import db, Chambre, Client, Reservation, ReservationArchive
+
+    application = creer_app()
+    with application.app_context():
+        db.session.add(Chambre(numero='101', type='Simple', prix_par_nuit=80, capacite=2))
+        db.session.add_all([Client(nom=f'Nom{i}', prenom='Prénom', email=f'client{i}@email.com')
+                            for i in range(3)])
+        db.session.flush()
+
+        # Client 1 : dates en partie identiques et lignes sans date, mélangées
+        dates = [datetime(2024, 3, 1, 10), None, datetime(2024, 3, 1, 10), datetime(2024, 5, 2),
+                 None, datetime(2023, 12, 31), None, datetime(2024, 3, 1, 10)]
+        sejours = [
+            {'id': 1 + i, 'client_id': 1, 'chambre_id': 1,
+             'date_arrivee': date(2025, 1, 1) + timedelta(days=3 * i),
+             'date_depart': date(2025, 1, 3) + timedelta(days=3 * i),
+             'nombre_personnes': 1, 'prix_total': 160, 'statut': 'terminee',
+             'date_reservation': date_reservation}
+            for i, date_reservation in enumerate(dates)
+        ]
+        # Client 2 : uniquement des lignes sans date
+        sejours += [dict(sejours[1], id=20 + i, client_id=2) for i in range(3)]
+        # Insertion Core : l'ORM remplacerait None par le défaut datetime.utcnow
+        db.session.execute(insert(Reservation.__table__), sejours)
+        db.session.execute(insert(ReservationArchive), [
+            dict(sejour, id=100 + sejour['id'], date_archivage=datetime(2025, 6, 1))
+            for sejour in sejours
+        ])
+        db.session.commit()
+    return application
+
+
+def parcourir(client, url, per_page, archive=False):
+    ids, curseur = [], None
+    while True:
+        parametres = {'per_page': per_page, 'archive': str(archive).lower()}
+        if curseur:
+            parametres['cursor'] = curseur
+        reponse = client.get(url, query_string=parametres)
+        assert reponse.status_code == 200, reponse.get_json()
+        corps = reponse.get_json()
+        ids += [reservation['id'] for reservation in corps['data']]
+        curseur = corps['pagination']['next_cursor']
+        assert len(corps['data']) == per_page or curseur is None
+        if curseur is None:
+            return ids
+
+
+@pytest.mark.parametrize('per_page', [1, 2, 3, 100])
+@pytest.mark.parametrize('archive, decalage', [(False, 0), (True, 100)])
+def test_ordre_avec_dates_nulles(app, per_page, archive, decalage):
+    ids = parcourir(app.test_client(), '/api/clients/1/reservations', per_page, archive)
+
+    # Plus récentes d'abord (date puis id), puis les lignes sans date par id décroissant
+    assert ids == [decalage + i for i in (4, 8, 3, 1, 6, 7, 5, 2)]
+
+
+@pytest.mark.parametrize('per_page', [1, 2, 5])
+def test_uniquement_des_dates_nulles(app, per_page):
+    assert parcourir(app.test_client(), '/api/clients/2/reservations', per_page) == [22, 21, 20]
+
+
+def test_historique_vide(app):
+    assert parcourir(app.test_client(), '/api/clients/3/reservations', 1) == []
+
+
+def test_curseurs(app):
+    from profiles import decoder_curseur, encoder_curseur
+
+    assert decoder_curseur(encoder_curseur(None, 7)) == (None, 7)
+    moment = datetime(2024, 3, 1, 10, 30)
+    assert decoder_curseur(encoder_curseur(moment, 8)) == (moment, 8)
+
+    reponse = app.test_client().get('/api/clients/1/reservations?cursor=pas-un-curseur')
+    assert reponse.status_code == 400
+
+
+@pytest.mark.parametrize('contenu', [
+    '[null, 1e400]',
+    '[null, 100000000000000000000000]',
+    '[null, -100000000000000000000000]',
+    '["2024-03-01T10:00:00", 9223372036854775808]',
+    '[null, "abc"]',
+    '[null, null]',
+    '["pas une date", 1]',
+    '[null]',
+    '{}',
+])
+def test_curseur_altere(app, contenu):
+    from profiles import decoder_curseur
+
+    curseur = base64.urlsafe_b64encode(contenu.encode()).decode().rstrip('=')
+    with pytest.raises(ValueError, match='Curseur invalide'):
+        decoder_curseur(curseur)
+    for archive in ('false', 'true'):
+        reponse = app.test_client().get('/api/clients/1/reservations',
+                                        query_string={'cursor': curseur, 'archive': archive})
+        assert reponse.status_code == 400
+        assert reponse.get_json() == {'success': False, 'message': 'Curseur invalide'}
+
+
+@pytest.fixture
+def app_resume(creer_app):
+    from models import db, Chambre, Client, Reservation, ReservationArchive
+
+    application = creer_app(CLIENT_PROFILE_CACHE_TTL=3600)
+    aujourd_hui = date.today()
+    with application.app_context():
+        db.session.add(Chambre(numero='101', type='Simple', prix_par_nuit=80, capacite=2))
+        db.session.add_all([Client(nom=f'Nom{i}', prenom='Prénom', email=f'client{i}@email.com')
+                            for i in range(2)])
+        db.session.flush()
+
+        def sejour(decalage, prix, statut):
+            arrivee = aujourd_hui + timedelta(days=decalage)
+            return {'client_id': 1, 'chambre_id': 1, 'date_arrivee': arrivee,
+                    'date_depart': arrivee + timedelta(days=1), 'nombre_personnes': 1,
+                    'prix_total': prix, 'statut': statut}
+
+        db.session.execute(insert(Reservation), [
+            sejour(-10, 200, 'terminee'),
+            sejour(0, 100, 'confirmee'),     # arrivée aujourd'hui : séjour commencé
+            sejour(5, 300, 'confirmee'),
+            sejour(30, 400, 'en_attente'),
+            sejour(-3, 1000, 'annulee'),
+            sejour(2, 500, 'annulee'),
+        ])
+        db.session.execute(insert(ReservationArchive), [
+            dict(sejour(-400, 150, 'terminee'), id=1000, date_archivage=datetime(2025, 6, 1)),
+            dict(sejour(-500, 70, 'annulee'), id=1001, date_archivage=datetime(2025, 6, 1)),
+        ])
+        db.session.commit()
+    return application
+
+
+def resume(client, client_id):
+    reponse = client.get(f'/api/clients/{client_id}')
+    assert reponse.status_code == 200
+    return reponse.get_json()['data']['resume']
+
+
+def test_resume(app_resume):
+    aujourd_hui = date.today()
+    donnees = resume(app_resume.test_client(), 1)
+
+    # Séjours commencés (dont l'archivé) et à venir ; les annulations hors dépense
+    assert Decimal(donnees.pop('depense_totale')) == 200 + 100 + 150
+    assert donnees == {
+        'nombre_sejours': 3,
+        'dernier_sejour': aujourd_hui.isoformat(),
+        'sejours_a_venir': 2,
+        'prochain_sejour': (aujourd_hui + timedelta(days=5)).isoformat(),
+        'annulations': 3,
+    }
+
+    vide = resume(app_resume.test_client(), 2)
+    assert Decimal(vide.pop('depense_totale')) == 0
+    assert vide == {'nombre_sejours': 0, 'dernier_sejour': None, 'sejours_a_venir': 0,
+                    'prochain_sejour': None, 'annulations': 0}
+
+
+def test_resume_selon_la_date(app_resume):
+    from profiles import calculer_resume
+
+    aujourd_hui = date.today()
+    with app_resume.app_context():
+        # La veille, le séjour arrivant aujourd'hui est encore à venir
+        veille = calculer_resume(1, aujourd_hui - timedelta(days=1))
+        assert (veille['nombre_sejours'], veille['sejours_a_venir']) == (2, 3)
+        assert veille['prochain_sejour'] == aujourd_hui
+        assert veille['dernier_sejour'] == aujourd_hui - timedelta(days=10)
+
+        # Bien plus tard, tous les séjours non annulés sont commencés
+        apres = calculer_resume(1, aujourd_hui + timedelta(days=60))
+        assert (apres['nombre_sejours'], apres['sejours_a_venir']) == (5, 0)
+        assert apres['prochain_sejour'] is None
+        assert apres['depense_totale'] == 200 + 100 + 300 + 400 + 150
+
+
+def test_cache_invalide_par_les_ecritures(app_resume):
+    from models import db, Reservation
+
+    client = app_resume.test_client()
+    assert resume(client, 2)['sejours_a_venir'] == 0
+
+    # Écriture hors ORM : le résumé en cache n'est pas recalculé
+    with app_resume.app_context():
+        db.session.execute(update(Reservation).where(Reservation.id == 1).values(client_id=2))
+        db.session.commit()
+    assert resume(client, 2)['nombre_sejours'] == 0
+
+    arrivee = date.today() + timedelta(days=3)
+    reponse = client.post('/api/reservations', json={
+        'client_id': 2, 'chambre_id': 1, 'date_arrivee': arrivee.isoformat(),
+        'date_depart': (arrivee + timedelta(days=2)).isoformat(),
+        'nombre_personnes': 1, 'prix_total': '240.00'})
+    assert reponse.status_code == 201
+    reservation_id = reponse.get_json()['data']['id']
+
+    donnees = resume(client, 2)
+    assert donnees['nombre_sejours'] == 1  # la réservation déplacée, enfin prise en compte
+    assert donnees['sejours_a_venir'] == 1
+    assert donnees['prochain_sejour'] == arrivee.isoformat()
+    assert donnees['annulations'] == 0
+
+    assert client.put(f'/api/reservations/{reservation_id}/cancel').status_code == 200
+    donnees = resume(client, 2)
+    assert donnees['sejours_a_venir'] == 0
+    assert donnees['prochain_sejour'] is None
+    assert donnees['annulations'] == 1
+    assert Decimal(donnees['depense_totale']) == 200
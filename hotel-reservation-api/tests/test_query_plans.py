@@ -0,0 +1,211 @@
+"""
+Tests de non-régression des plans d'exécution
+
+Chaque endpoint est appelé sur une base peuplée ; les SELECT qu'il émet sont
+rejoués sous EXPLAIN et le test échoue si l'un d'eux parcourt séquentiellement
+une table de plus de SEUIL_LIGNES lignes (hors parcours déclarés voulus).
+
+Base utilisée : TEST_DATABASE_URL (PostgreSQL ou SQLite ; ses tables sont
+supprimées puis recréées), par défaut un fichier SQLite temporaire.
+
+    python -m pytest tests/test_query_plans.py
+"""
+import json
+import os
+import re
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+
+SEUIL_LIGNES = int(os.environ.get('PLAN_SEUIL_LIGNES') or 1000)
+
+VOLUMES = {
+    'chambres': 200,
+    'clients': 3000,
+    'reservations': 20000,
+    'reservations_archive': 5000,
+    'reservations_staging': 5000,
+}
+
+AUJOURD_HUI = date.today()
+ARRIVEE = (AUJOURD_HUI + timedelta(days=30)).isoformat()
+DEPART = (AUJOURD_HUI + timedelta(days=33)).isoformat()
+
+# (nom, méthode, url, corps JSON, tables dont le parcours complet est voulu)
+CAS = [
+    # Pagination LIMIT/OFFSET sans filtre : le parcours s'arrête à la page
+    ('clients_page', 'GET', '/api/clients?page=3', None, {'clients'}),
+    ('client', 'GET', '/api/clients/5', None, set()),
+    ('clients_ids', 'GET', '/api/clients?ids=3,4,5', None, set()),
+    ('client_historique', 'GET', '/api/clients/7/reservations?per_page=3', None, set()),
+    ('client_historique_curseur', 'GET',
+     '/api/clients/7/reservations?per_page=3&cursor=WyIyMDI0LTAxLTA1VDAwOjAwOjAwIiwgOTk5OTld',
+     None, set()),
+    ('client_historique_archives', 'GET', '/api/clients/7/reservations?archive=true', None, set()),
+    ('chambres_filtre', 'GET', '/api/chambres?type=Suite&disponible=true', None, set()),
+    ('reservations', 'GET', '/api/reservations', None, set()),
+    ('reservations_statut', 'GET', '/api/reservations?statut=confirmee', None, set()),
+    ('reservations_client', 'GET', '/api/reservations?client_id=7', None, set()),
+    ('reservations_ids', 'GET', '/api/reservations?ids=3,9,27', None, set()),
+    ('archives_client', 'GET', '/api/reservations?archive=true&client_id=7', None, set()),
+    # Les compteurs globaux lisent toute la table (au mieux via un index couvrant)
+    ('stats', 'GET', '/api/stats', None, {'clients', 'reservations'}),
+    ('quotes', 'POST', '/api/quotes', [
+        {'chambre_id': 1, 'date_arrivee': ARRIVEE, 'date_depart': DEPART},
+        {'type': 'Suite', 'date_arrivee': ARRIVEE, 'date_depart': DEPART, 'nombre_personnes': 2},
+    ], set()),
+]
+
+
+@pytest.fixture(scope='module')
+def app(creer_app):
+    from models import db
+
+    application = creer_app(os.environ.get('TEST_DATABASE_URL'))
+    with application.app_context():
+        db.drop_all(bind_key=None)
+        db.create_all(bind_key=None)
+        peupler(db)
+    return application
+
+
+def peupler(db):
+    """Insère des volumes réalistes puis met à jour les statistiques"""
+    from models import Chambre, Client, Reservation, ReservationArchive, ReservationStaging
+
+    types = ['Simple', 'Double', 'Suite']
+    statuts = ['confirmee', 'annulee', 'terminee']
+    debut = AUJOURD_HUI - timedelta(days=400)
+    creation = datetime(2024, 1, 1)
+
+    db.session.execute(insert(Chambre), [
+        {'numero': str(i), 'type': types[i % 3], 'prix_par_nuit': 100 + i % 50,
+         'capacite': 1 + i % 4, 'disponible': i % 7 != 0}
+        for i in range(VOLUMES['chambres'])
+    ])
+    db.session.execute(insert(Client), [
+        {'nom': f'Nom{i}', 'prenom': 'Prenom', 'email': f'client{i}@email.com',
+         'date_creation': creation}
+        for i in range(VOLUMES['clients'])
+    ])
+
+    def sejour(i):
+        arrivee = debut + timedelta(days=i % 700)
+        return {
+            'client_id': 1 + i % VOLUMES['clients'],
+            'chambre_id': 1 + i % VOLUMES['chambres'],
+            'date_arrivee': arrivee,
+            'date_depart': arrivee + timedelta(days=2),
+            'nombre_personnes': 1,
+            'prix_total': 200,
+            'statut': statuts[i % 3],
+            'date_reservation': creation + timedelta(minutes=i),
+        }
+
+    db.session.execute(insert(Reservation), [sejour(i) for i in range(VOLUMES['reservations'])])
+    db.session.execute(insert(ReservationArchive), [
+        dict(sejour(i), id=100000 + i) for i in range(VOLUMES['reservations_archive'])
+    ])
+    db.session.execute(insert(ReservationStaging), [
+        {'client_nom': f'Nom{i}', 'traite': i % 50 != 0}
+        for i in range(VOLUMES['reservations_staging'])
+    ])
+    db.session.commit()
+
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+@contextmanager
+def capturer_selects(engine):
+    """Collecte (sql, paramètres) des SELECT exécutés sur le moteur"""
+    requetes = []
+
+    def ecouter(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            requetes.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', ecouter)
+    try:
+        yield requetes
+    finally:
+        event.remove(engine, 'before_cursor_execute', ecouter)
+
+
+def _parcours_postgresql(noeud):
+    if noeud.get('Node Type') == 'Seq Scan':
+        yield noeud['Relation Name']
+    for enfant in noeud.get('Plans', []):
+        yield from _parcours_postgresql(enfant)
+
+
+def parcours_sequentiels(connexion, sql, parametres):
+    """Tables parcourues séquentiellement par le plan de la requête"""
+    if connexion.dialect.name == 'postgresql':
+        plan = connexion.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + sql, parametres).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return set(_parcours_postgresql(plan[0]['Plan']))
+
+    # SQLite : « SCAN table » sans index (les « USING ... INDEX » sont des parcours d'index)
+    lignes = connexion.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql, parametres).fetchall()
+    tables = set()
+    for ligne in lignes:
+        trouve = re.match(r'^SCAN (\w+)(?: AS \w+)?$', ligne[-1])
+        if trouve:
+            tables.add(trouve.group(1))
+    return tables
+
+
+def verifier_plans(db, requetes, autorises):
+    problemes = []
+    with db.engine.connect() as connexion:
+        for sql, parametres in requetes:
+            for table in parcours_sequentiels(connexion, sql, parametres):
+                if VOLUMES.get(table, 0) > SEUIL_LIGNES and table not in autorises:
+                    problemes.append(f'{table} ({VOLUMES[table]} lignes) : {" ".join(sql.split())}')
+    return problemes
+
+
+@pytest.mark.parametrize('nom, methode, url, corps, autorises', CAS, ids=[c[0] for c in CAS])
+def test_plan_endpoint(app, nom, methode, url, corps, autorises):
+    from models import db
+
+    client = app.test_client()
+    with app.app_context():
+        with capturer_selects(db.engine) as requetes:
+            reponse = client.open(url, method=methode, json=corps)
+        assert reponse.status_code == 200, reponse.get_data(as_text=True)
+        assert requetes, f'Aucune requête capturée pour {url}'
+        problemes = verifier_plans(db, requetes, autorises)
+
+    assert not problemes, 'Parcours séquentiels :\n' + '\n'.join(problemes)
+
+
+def test_plan_staging_non_traite(app):
+    """Lecture des lignes NiFi à traiter : index partiel WHERE traite = false"""
+    from models import db, ReservationStaging
+
+    with app.app_context():
+        with capturer_selects(db.engine) as requetes:
+            ReservationStaging.query.filter(ReservationStaging.traite == db.false()) \
+                .order_by(ReservationStaging.id).limit(100).all()
+        problemes = verifier_plans(db, requetes, set())
+
+    assert not problemes, 'Parcours séquentiels :\n' + '\n'.join(problemes)
+
+
+def test_plan_maintenance(app):
+    """Sélection des lots de la maintenance (exécutée en dernier : modifie les données)"""
+    from maintenance import archiver_reservations, terminer_sejours
+    from models import db
+
+    with app.app_context():
+        with capturer_selects(db.engine) as requetes:
+            terminer_sejours(taille_lot=500)
+            archiver_reservations(horizon_jours=365, taille_lot=500)
+        problemes = verifier_plans(db, requetes, set())
+
+    assert not problemes, 'Parcours séquentiels :\n' + '\n'.join(problemes)
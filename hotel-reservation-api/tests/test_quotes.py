@@ -0,0 +1,146 @@
+"""
+Devis groupés : mêmes résultats que demande par demande, nombre de requêtes
+constant et cas limites
+
+    python -m pytest tests/test_quotes.py
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from benchmarks.bench_quotes import grille, peupler
+
+
+@pytest.fixture(scope='module')
+def app(creer_app):
+    from models import db
+
+    application = creer_app(COMPRESS_ENABLED=False)
+    with application.app_context():
+        application.debut = peupler(db, 30, 600)
+    return application
+
+
+def evaluer(app, demandes):
+    reponse = app.test_client().post('/api/quotes', json={'demandes': demandes})
+    assert reponse.status_code == 200, reponse.get_json()
+    return reponse.get_json()['data']
+
+
+def par_type(demande, type_chambre):
+    """La même demande portant sur un type de chambre"""
+    demande = dict(demande, type=type_chambre)
+    del demande['chambre_id']
+    return demande
+
+
+def test_grille_identique_demande_par_demande(app):
+    from models import demandes_devis_schema
+    from pricing import moteur
+    from quotes import evaluer_demandes
+
+    demandes = grille(app.debut, 30, 300)
+    demandes += [par_type(demande, 'Suite') for demande in demandes[:30]]
+    resultats = evaluer(app, demandes)
+
+    with app.test_request_context():
+        unitaires = [evaluer_demandes([demande])[0]
+                     for demande in demandes_devis_schema.load(demandes)]
+        for resultat, unitaire in zip(resultats, unitaires):
+            assert dict(resultat, index=0) == unitaire
+            if resultat['chambre_id'] is not None and resultat['prix_total'] is not None:
+                devis = moteur.devis(resultat['chambre_id'],
+                                     date.fromisoformat(resultat['date_arrivee']),
+                                     date.fromisoformat(resultat['date_depart']))
+                assert resultat['prix_total'] == str(devis.prix_total)
+
+    assert any(r['disponible'] for r in resultats)
+    assert any(not r['disponible'] for r in resultats)
+
+
+@pytest.mark.parametrize('cellules', [10, 500])
+def test_requetes_constantes(app, cellules):
+    from models import db
+
+    demandes = grille(app.debut, 30, cellules)
+    evaluer(app, demandes)  # tables de prix déjà compilées
+
+    requetes = []
+
+    def compter(*args):
+        requetes.append(1)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', compter)
+    try:
+        assert len(evaluer(app, demandes)) == cellules
+    finally:
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', compter)
+    assert len(requetes) == 2
+
+
+def test_chambre_absente_des_tables(app, monkeypatch):
+    from pricing import moteur
+
+    # Chambre supprimée entre la lecture des chambres et celle des tables
+    monkeypatch.setattr(moteur, 'table', lambda chambre_id: None)
+    demande = grille(app.debut, 30, 1)[0]
+    resultats = evaluer(app, [demande, par_type(demande, 'Simple')])
+
+    assert resultats[0]['motif'] == 'Chambre introuvable'
+    assert resultats[1]['motif'] == 'Aucune chambre de ce type disponible'
+
+
+def test_sejour_trop_long(app):
+    max_nuits = app.config['PRICING_MAX_NIGHTS']
+    arrivee = app.debut
+    demande = {'chambre_id': 2, 'date_arrivee': arrivee.isoformat()}
+
+    assert evaluer(app, [dict(demande, date_depart=(arrivee + timedelta(days=max_nuits))
+                              .isoformat())])[0]['nb_nuits'] == max_nuits
+
+    reponse = app.test_client().post('/api/quotes', json=[
+        dict(demande, date_depart=(arrivee + timedelta(days=max_nuits + 1)).isoformat())
+    ])
+    assert reponse.status_code == 400
+    assert 'date_depart' in reponse.get_json()['errors']['0']
+
+
+def test_occupation_sejours_chevauchants():
+    from quotes import _Occupation
+
+    jour = date(2025, 3, 1)
+    occupation = _Occupation([(jour + timedelta(days=a), jour + timedelta(days=d))
+                              for a, d in [(10, 12), (0, 30), (5, 6), (40, 42)]])
+
+    def libre(arrivee, depart):
+        return occupation.libre(jour + timedelta(days=arrivee), jour + timedelta(days=depart))
+
+    # Le long séjour (0, 30) couvre les trous laissés par les autres
+    assert not libre(20, 22)
+    assert not libre(-3, 1)
+    assert not libre(29, 31)
+    assert libre(-5, 0)
+    assert libre(30, 40)
+    assert not libre(41, 45)
+    assert libre(42, 50)
+
+
+def test_fenetre_tres_large(app):
+    import time
+
+    # Dates extrêmes sur des chambres réservées : pas de coût proportionnel à l'écart
+    demandes = [
+        {'type': 'Simple', 'date_arrivee': '0001-01-01', 'date_depart': '0001-01-03'},
+        {'type': 'Simple', 'date_arrivee': '9999-12-01', 'date_depart': '9999-12-03'},
+        {'chambre_id': 1, 'date_arrivee': '0001-01-01', 'date_depart': '0001-01-02'},
+        {'chambre_id': 2, 'date_arrivee': '9999-12-30', 'date_depart': '9999-12-31'},
+    ]
+    debut = time.perf_counter()
+    resultats = evaluer(app, demandes)
+    assert time.perf_counter() - debut < 1.0
+
+    assert [r['disponible'] for r in resultats] == [True, True, False, True]
+    assert resultats[2]['motif'] == 'Chambre non disponible'
@@ -0,0 +1,161 @@
+"""
+Routage lecture/écriture entre la base primaire et un réplica
+
+Primaire et réplica sont deux fichiers SQLite distincts, sans réplication :
+le contenu renvoyé indique quelle base a servi la requête.
+
+    python -m pytest tests/test_replicas.py
+"""
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+from sqlalchemy import select
+
+
+@pytest.fixture(scope='module')
+def replica():
+    descripteur, fichier = tempfile.mkstemp(suffix='.db')
+    os.close(descripteur)
+    yield f'sqlite:///{fichier}'
+    os.remove(fichier)
+
+
+@pytest.fixture(scope='module')
+def app(creer_app, replica):
+    from models import db, Client
+
+    application = creer_app(DB_REPLICA_URIS=[replica], REPLICA_STICKY_SECONDS=5)
+    with application.app_context():
+        db.metadata.create_all(db.engines['replica_0'])
+        db.session.add(Client(nom='Primaire', prenom='Base', email='primaire@email.com'))
+        db.session.commit()
+        with db.engines['replica_0'].begin() as connexion:
+            connexion.execute(Client.__table__.insert(),
+                              {'nom': 'Replica', 'prenom': 'Base', 'email': 'replica@email.com'})
+    return application
+
+
+def noms(reponse):
+    assert reponse.status_code == 200
+    return {client['nom'] for client in reponse.get_json()['data']}
+
+
+def noms_en_base(app, cle):
+    from models import db, Client
+
+    with app.app_context():
+        engine = db.engines[cle] if cle else db.engine
+        with engine.connect() as connexion:
+            return set(connexion.scalars(select(Client.nom)))
+
+
+def ecarts(avant):
+    from replicas import metriques
+    return {cle: valeur - avant[cle] for cle, valeur in metriques.items() if valeur != avant[cle]}
+
+
+def test_lecture_sur_replica(app):
+    from replicas import metriques
+
+    avant = dict(metriques)
+    assert noms(app.test_client().get('/api/clients')) == {'Replica'}
+    assert ecarts(avant) == {'lectures_replica': 1}
+
+
+def test_ecritures_et_lectures_collantes(app):
+    from replicas import COOKIE_PRIMAIRE, metriques
+
+    client = app.test_client()
+    avant = dict(metriques)
+    reponse = client.post('/api/clients', json={
+        'nom': 'Nouveau', 'prenom': 'Client', 'email': 'nouveau@email.com'})
+    assert reponse.status_code == 201
+    assert 'Nouveau' in noms_en_base(app, None)
+    assert 'Nouveau' not in noms_en_base(app, 'replica_0')
+
+    reponse = client.put(f"/api/clients/{reponse.get_json()['data']['id']}",
+                         json={'prenom': 'Modifié'})
+    assert reponse.status_code == 200
+
+    # Cookie valide : les lectures restent sur la primaire
+    assert client.get_cookie(COOKIE_PRIMAIRE) is not None
+    assert noms(client.get('/api/clients')) == {'Primaire', 'Nouveau'}
+    assert ecarts(avant) == {'ecritures': 2, 'lectures_collantes': 1}
+
+    # Cookie expiré : retour au réplica
+    client.set_cookie(COOKIE_PRIMAIRE, str(time.time() - 1))
+    assert noms(client.get('/api/clients')) == {'Replica'}
+
+
+def test_flush_sur_primaire(app):
+    from models import db, Client
+
+    with app.test_request_context('/api/clients'):
+        app.preprocess_request()
+        assert db.session.scalars(select(Client.nom)).all() == ['Replica']
+        db.session.add(Client(nom='Flush', prenom='Base', email='flush@email.com'))
+        db.session.commit()
+        db.session.remove()
+
+    assert 'Flush' in noms_en_base(app, None)
+    assert 'Flush' not in noms_en_base(app, 'replica_0')
+
+
+def test_lecture_seule_sur_replica(app):
+    from replicas import COOKIE_PRIMAIRE, metriques
+
+    client = app.test_client()
+    avant = dict(metriques)
+    reponse = client.post('/api/quotes', json=[])
+    assert reponse.status_code == 200
+    assert client.get_cookie(COOKIE_PRIMAIRE) is None
+    assert ecarts(avant) == {'lectures_replica': 1}
+
+
+def test_replica_indisponible(creer_app):
+    from replicas import COOKIE_PRIMAIRE, metriques
+
+    app = creer_app(DB_REPLICA_URIS=['sqlite:////dossier/inexistant/replica.db'])
+    client = app.test_client()
+    client.post('/api/clients', json={'nom': 'Seul', 'prenom': 'Client', 'email': 'seul@email.com'})
+    client.delete_cookie(COOKIE_PRIMAIRE)
+
+    avant = dict(metriques)
+    assert noms(client.get('/api/clients')) == {'Seul'}
+    assert ecarts(avant) == {'lectures_primaire': 1, 'replicas_indisponibles': 1}
+    assert app.extensions['replicas'].etat() == {'replica_0': False}
+
+
+def test_un_seul_controle_de_sante_a_la_fois(app, monkeypatch):
+    routage = app.extensions['replicas']
+    controles = []
+    controler = routage._controler
+
+    def controle_lent(cle):
+        controles.append(cle)
+        time.sleep(0.05)
+        return controler(cle)
+
+    monkeypatch.setattr(routage, '_controler', controle_lent)
+    routage._prochain_controle['replica_0'] = 0.0
+
+    depart = threading.Barrier(8)
+    resultats = []
+
+    def requete():
+        with app.app_context():
+            depart.wait()
+            resultats.append(routage.est_sain('replica_0'))
+
+    fils = [threading.Thread(target=requete) for _ in range(8)]
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+
+    assert controles == ['replica_0']
+    assert resultats == [True] * 8
+    assert routage._prochain_controle['replica_0'] > time.monotonic()
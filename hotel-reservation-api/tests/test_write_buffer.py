@@ -0,0 +1,87 @@
+"""
+Statuts des chambres en mode 'buffered' : tampon, vidage et écritures directes
+
+Le vidage périodique est repoussé (ROOM_STATUS_FLUSH_MS élevé) : chaque test
+le déclenche lui-même avec tampon.vider().
+
+    python -m pytest tests/test_write_buffer.py
+"""
+import pytest
+from sqlalchemy import select
+
+
+@pytest.fixture
+def app(creer_app):
+    from models import db, Chambre
+
+    application = creer_app(ROOM_STATUS_DURABILITY='buffered', ROOM_STATUS_FLUSH_MS=60000,
+                            ROOM_STATUS_FLUSH_ITEMS=1000)
+    with application.app_context():
+        db.session.add_all([Chambre(numero=str(100 + i), type='Simple', prix_par_nuit=80,
+                                    capacite=2, disponible=True)
+                            for i in range(3)])
+        db.session.commit()
+    return application
+
+
+def disponibilites(app):
+    from models import db, Chambre
+
+    with app.app_context():
+        return dict(db.session.execute(select(Chambre.id, Chambre.disponible)).all())
+
+
+def test_statuts_regroupes_puis_vides(app):
+    client = app.test_client()
+    tampon = app.extensions['tampon_statuts']
+
+    for disponible in (False, True, False):
+        reponse = client.patch('/api/chambres/status', json=[{'id': 1, 'disponible': disponible}])
+        assert reponse.status_code == 202
+    reponse = client.patch('/api/chambres/status', json=[{'id': 2, 'disponible': False}])
+    assert reponse.get_json()['data']['en_attente'] == 2
+    assert disponibilites(app) == {1: True, 2: True, 3: True}
+
+    assert tampon.vider() == 2
+    assert disponibilites(app) == {1: False, 2: False, 3: True}
+    assert tampon.en_attente() == 0
+
+
+def test_put_prime_sur_le_tampon(app):
+    client = app.test_client()
+    tampon = app.extensions['tampon_statuts']
+
+    assert client.patch('/api/chambres/status',
+                        json=[{'id': 1, 'disponible': False},
+                              {'id': 2, 'disponible': False}]).status_code == 202
+    reponse = client.put('/api/chambres/1', json={'disponible': True})
+    assert reponse.status_code == 200
+    assert tampon.en_attente() == 1
+
+    tampon.vider()
+    assert disponibilites(app) == {1: True, 2: False, 3: True}
+
+
+def test_put_sans_disponible_laisse_le_tampon(app):
+    client = app.test_client()
+    tampon = app.extensions['tampon_statuts']
+
+    client.patch('/api/chambres/status', json=[{'id': 3, 'disponible': False}])
+    assert client.put('/api/chambres/3', json={'capacite': 4}).status_code == 200
+    assert tampon.en_attente() == 1
+
+    tampon.vider()
+    assert disponibilites(app)[3] is False
+
+
+def test_patch_sync_prime_sur_le_tampon(app):
+    client = app.test_client()
+    tampon = app.extensions['tampon_statuts']
+
+    client.patch('/api/chambres/status', json=[{'id': 2, 'disponible': False}])
+    reponse = client.patch('/api/chambres/status?durabilite=sync',
+                           json=[{'id': 2, 'disponible': True}])
+    assert reponse.status_code == 200
+
+    tampon.vider()
+    assert disponibilites(app)[2] is True
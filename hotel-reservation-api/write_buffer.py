@@ -0,0 +1,193 @@
+"""
+Écritures groupées de la disponibilité des chambres.
+
+PATCH /api/chambres/status reçoit de nombreux couples (id, disponible) ;
+les doublons sont fusionnés (la dernière valeur l'emporte) puis écrits par une
+seule instruction UPDATE et un seul commit : ``UPDATE ... FROM (VALUES ...)``
+sous PostgreSQL, ``UPDATE ... SET disponible = CASE id ...`` ailleurs.
+
+Avec ROOM_STATUS_DURABILITY='buffered', les statuts sont en plus regroupés en
+mémoire par TamponStatuts et vidés toutes les ROOM_STATUS_FLUSH_MS ou dès
+ROOM_STATUS_FLUSH_ITEMS chambres en attente : les mises à jour répétées d'une
+même chambre ne coûtent qu'une ligne écrite. Un statut accepté mais pas encore
+vidé est perdu si le processus est tué brutalement.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from sqlalchemy import Boolean, Integer, case, column, select, update, values
+
+from models import db, Chambre
+
+logger = logging.getLogger(__name__)
+
+DURABILITES = ('sync', 'buffered')
+
+metriques = {
+    'demandes': 0,
+    'statuts_recus': 0,
+    'statuts_coalesces': 0,
+    'commits': 0,
+    'lignes_ecrites': 0,
+    'introuvables': 0,
+    'vidages_echoues': 0
+}
+_verrou_metriques = threading.Lock()
+
+
+def _compter(**increments):
+    with _verrou_metriques:
+        for cle, valeur in increments.items():
+            metriques[cle] += valeur
+
+
+def coalescer(elements):
+    """{chambre_id: disponible} à partir d'une liste chargée par le schéma"""
+    statuts = {}
+    for element in elements:
+        statuts[element['id']] = element['disponible']
+    _compter(demandes=1, statuts_recus=len(elements),
+             statuts_coalesces=len(elements) - len(statuts))
+    return statuts
+
+
+def appliquer_statuts(statuts):
+    """Écrit les statuts en une instruction UPDATE (sans commit) ; renvoie les ids modifiés"""
+    if db.engine.dialect.name == 'postgresql':
+        lignes = values(column('id', Integer), column('disponible', Boolean), name='v') \
+            .data(list(statuts.items()))
+        requete = update(Chambre).where(Chambre.id == lignes.c.id) \
+            .values(disponible=lignes.c.disponible)
+    else:
+        requete = update(Chambre).where(Chambre.id.in_(list(statuts))) \
+            .values(disponible=case(statuts, value=Chambre.id))
+    options = {'synchronize_session': False}
+
+    if db.engine.dialect.update_returning:
+        ids = db.session.scalars(requete.returning(Chambre.id), execution_options=options).all()
+    else:
+        ids = db.session.scalars(select(Chambre.id).where(Chambre.id.in_(list(statuts)))).all()
+        db.session.execute(requete, execution_options=options)
+
+    _compter(lignes_ecrites=len(ids), introuvables=len(statuts) - len(ids))
+    return set(ids)
+
+
+def ecrire_statuts(statuts, tampon=None):
+    """Écriture immédiate et validée ; prime sur les valeurs encore dans le tampon"""
+    if tampon is None:
+        modifies = appliquer_statuts(statuts)
+        db.session.commit()
+        _compter(commits=1)
+        return modifies
+
+    with tampon.verrou_ecriture:
+        tampon.retirer(statuts)
+        modifies = appliquer_statuts(statuts)
+        db.session.commit()
+        _compter(commits=1)
+    return modifies
+
+
+class TamponStatuts:
+    """Regroupe les statuts en mémoire et les écrit par lots depuis un thread"""
+
+    def __init__(self, app, intervalle, seuil):
+        self.app = app
+        self.intervalle = intervalle
+        self.seuil = seuil
+        self.verrou_ecriture = threading.Lock()
+        self._verrou = threading.Lock()
+        self._en_attente = {}
+        self._reveil = threading.Event()
+        self._arret = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def en_attente(self):
+        with self._verrou:
+            return len(self._en_attente)
+
+    def ajouter(self, statuts):
+        """Met les statuts en attente ; renvoie le nombre de chambres en attente"""
+        with self._verrou:
+            coalesces = sum(1 for chambre_id in statuts if chambre_id in self._en_attente)
+            self._en_attente.update(statuts)
+            taille = len(self._en_attente)
+        _compter(statuts_coalesces=coalesces)
+
+        self._demarrer()
+        if taille >= self.seuil:
+            self._reveil.set()
+        return taille
+
+    def retirer(self, ids):
+        with self._verrou:
+            for chambre_id in ids:
+                self._en_attente.pop(chambre_id, None)
+
+    def _demarrer(self):
+        # Démarrage paresseux : un thread lancé avant un fork n'existe pas dans l'enfant
+        with self._verrou:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._arret.clear()
+            self._thread = threading.Thread(target=self._boucle, name='tampon-statuts', daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            self._reveil.wait(self.intervalle)
+            self._reveil.clear()
+            self.vider()
+
+    def vider(self):
+        """Écrit tout ce qui est en attente en un UPDATE et un commit"""
+        with self.verrou_ecriture:
+            with self._verrou:
+                lot, self._en_attente = self._en_attente, {}
+            if not lot:
+                return 0
+
+            with self.app.app_context():
+                try:
+                    appliquer_statuts(lot)
+                    db.session.commit()
+                    _compter(commits=1)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Échec du vidage de %d statut(s) de chambre', len(lot))
+                    _compter(vidages_echoues=1)
+                    # Nouvel essai au prochain vidage, sans écraser les valeurs plus récentes
+                    with self._verrou:
+                        for chambre_id, disponible in lot.items():
+                            self._en_attente.setdefault(chambre_id, disponible)
+                    return 0
+                finally:
+                    db.session.remove()
+        return len(lot)
+
+    def arreter(self):
+        """Arrête le thread et écrit les statuts restants"""
+        self._arret.set()
+        self._reveil.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=max(1.0, 2 * self.intervalle))
+        self.vider()
+
+
+def init_write_buffer(app):
+    """Crée le tampon si ROOM_STATUS_DURABILITY='buffered' (vidé à la sortie du processus)"""
+    durabilite = app.config['ROOM_STATUS_DURABILITY']
+    if durabilite not in DURABILITES:
+        raise ValueError(f"ROOM_STATUS_DURABILITY doit valoir {' ou '.join(DURABILITES)}")
+    if durabilite != 'buffered':
+        return
+
+    tampon = TamponStatuts(app, app.config['ROOM_STATUS_FLUSH_MS'] / 1000,
+                           app.config['ROOM_STATUS_FLUSH_ITEMS'])
+    app.extensions['tampon_statuts'] = tampon
+    atexit.register(tampon.arreter)